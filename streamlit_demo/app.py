@@ -9,16 +9,22 @@ price manipulation bypass, and intelligent recommendations.
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import time as time_module
-import random
+from typing import Optional
 import hashlib
-import base64
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Tuple
-import math
+import os
+import uuid
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from cheepnow.core import (
+    AIRLINES, AIRPORTS, DEPARTURE_TIME_WINDOWS, FLEXIBLE_DATE_DAYS, PERF_ENV, PERF_RECORDER, RESULT_PAGE_SIZES,
+    RESULT_SORTS, ROUND_TRIP_RANKINGS, SUMMARY_LEADERS, FlightView, PriceAlert, PriceAlertEngine, PriceHistoryStore, PriceLock,
+    PriceLockStore, SearchCache, apply_preferences,
+    build_fare_matrix, create_storage_backend, fare_key, get_lock_time_remaining, paginate, perf_timer,
+    epoch_bucket, rank_round_trips, search_flexible_dates, search_flights, search_round_trip, session_rng,
+    simulate_anti_manipulation,
+)
 
 # Configure Streamlit page with enhanced settings
 st.set_page_config(
@@ -44,207 +50,49 @@ st.set_page_config(
     }
 )
 
-# Enhanced Data Models with more features
-@dataclass
-class Airline:
-    code: str
-    name: str
-    type: str  # 'budget', 'full-service', 'low-cost'
-    carry_on_included: bool
-    checked_baggage_included: bool
-    checked_baggage_weight: int
-    logo: str
-    on_time_performance: float  # 0.0 to 1.0
-    customer_rating: float  # 1.0 to 5.0
-    wifi_available: bool
-    meal_service: bool
-    loyalty_program: str
-
-@dataclass
-class Airport:
-    code: str
-    name: str
-    city: str
-    region: str
-    timezone: str
-    facilities: List[str]
-    distance_from_city: int  # km
-
-@dataclass
-class PriceHistory:
-    date: str
-    price: float
-    demand_level: str  # 'Low', 'Medium', 'High'
-
-@dataclass
-class Flight:
-    id: str
-    flight_number: str
-    airline: Airline
-    departure_airport: Airport
-    arrival_airport: Airport
-    departure_time: str
-    arrival_time: str
-    duration_minutes: int
-    base_price: float
-    taxes: float
-    total_price: float
-    seats_available: int
-    aircraft: str
-    price_locked_until: Optional[str] = None
-    price_trend: str = "stable"  # 'rising', 'falling', 'stable'
-    carbon_emissions: float = 0.0  # kg CO2
-    price_history: Optional[List[PriceHistory]] = None
-    value_score: float = 0.0
-    recommendation_reason: str = ""
-
-# Enhanced Philippine Airlines Data with realistic details
-AIRLINES = {
-    "5J": Airline(
-        code="5J", 
-        name="Cebu Pacific", 
-        type="budget", 
-        carry_on_included=True, 
-        checked_baggage_included=False, 
-        checked_baggage_weight=20, 
-        logo="🟦",
-        on_time_performance=0.82,
-        customer_rating=3.8,
-        wifi_available=False,
-        meal_service=False,
-        loyalty_program="GetGo"
-    ),
-    "PR": Airline(
-        code="PR", 
-        name="Philippine Airlines", 
-        type="full-service", 
-        carry_on_included=True, 
-        checked_baggage_included=True, 
-        checked_baggage_weight=23, 
-        logo="�",
-        on_time_performance=0.78,
-        customer_rating=4.1,
-        wifi_available=True,
-        meal_service=True,
-        loyalty_program="Mabuhay Miles"
-    ),
-    "Z2": Airline(
-        code="Z2", 
-        name="Philippines AirAsia", 
-        type="low-cost", 
-        carry_on_included=True, 
-        checked_baggage_included=False, 
-        checked_baggage_weight=20, 
-        logo="🔴",
-        on_time_performance=0.85,
-        customer_rating=3.9,
-        wifi_available=False,
-        meal_service=False,
-        loyalty_program="BIG Loyalty"
-    ),
-    "M8": Airline(
-        code="M8", 
-        name="Skyjet Airlines", 
-        type="regional", 
-        carry_on_included=True, 
-        checked_baggage_included=False, 
-        checked_baggage_weight=15, 
-        logo="🟨",
-        on_time_performance=0.88,
-        customer_rating=4.2,
-        wifi_available=False,
-        meal_service=True,
-        loyalty_program="Skyjet Rewards"
-    )
-}
+# Enhanced session state initialization
+def traveler_id() -> str:
+    """Stable id for a traveler signed in through `st.login`, otherwise a fresh id for this session only.
 
-AIRPORTS = {
-    "MNL": Airport(
-        code="MNL", 
-        name="Ninoy Aquino International Airport", 
-        city="Manila", 
-        region="Metro Manila",
-        timezone="Asia/Manila",
-        facilities=["WiFi", "Restaurants", "Duty Free", "Lounges", "ATM", "Currency Exchange"],
-        distance_from_city=7
-    ),
-    "CEB": Airport(
-        code="CEB", 
-        name="Mactan-Cebu International Airport", 
-        city="Cebu", 
-        region="Central Visayas",
-        timezone="Asia/Manila",
-        facilities=["WiFi", "Restaurants", "Duty Free", "Car Rental", "ATM"],
-        distance_from_city=12
-    ),
-    "DVO": Airport(
-        code="DVO", 
-        name="Francisco Bangoy International Airport", 
-        city="Davao", 
-        region="Mindanao",
-        timezone="Asia/Manila",
-        facilities=["WiFi", "Restaurants", "ATM", "Car Rental"],
-        distance_from_city=11
-    ),
-    "ILO": Airport(
-        code="ILO", 
-        name="Iloilo International Airport", 
-        city="Iloilo", 
-        region="Western Visayas",
-        timezone="Asia/Manila",
-        facilities=["WiFi", "Restaurants", "ATM"],
-        distance_from_city=18
-    ),
-    "BCD": Airport(
-        code="BCD", 
-        name="Bacolod-Silay Airport", 
-        city="Bacolod", 
-        region="Western Visayas",
-        timezone="Asia/Manila",
-        facilities=["WiFi", "Restaurants", "Car Rental"],
-        distance_from_city=16
-    ),
-    "TAG": Airport(
-        code="TAG", 
-        name="Tagbilaran Airport", 
-        city="Bohol", 
-        region="Central Visayas",
-        timezone="Asia/Manila",
-        facilities=["WiFi", "Restaurants", "ATM"],
-        distance_from_city=2
-    ),
-    "KLO": Airport(
-        code="KLO", 
-        name="Kalibo International Airport", 
-        city="Kalibo", 
-        region="Western Visayas",
-        timezone="Asia/Manila",
-        facilities=["WiFi", "Restaurants", "ATM", "Duty Free"],
-        distance_from_city=3
-    ),
-    "PPS": Airport(
-        code="PPS", 
-        name="Puerto Princesa Airport", 
-        city="Palawan", 
-        region="Mimaropa",
-        timezone="Asia/Manila",
-        facilities=["WiFi", "Restaurants", "ATM"],
-        distance_from_city=2
-    )
-}
+    The id authorizes price locks and alerts, so it is only ever derived
+    server side and never taken from the URL.
+    """
+    if st.user.get("is_logged_in") and st.user.get("sub"):
+        identity = f"{st.user.get('iss', '')}|{st.user['sub']}"
+        return hashlib.sha256(identity.encode()).hexdigest()[:32]
+    return uuid.uuid4().hex
 
-POPULAR_ROUTES = [
-    ("MNL", "CEB"), ("MNL", "DVO"), ("MNL", "ILO"), ("MNL", "BCD"),
-    ("CEB", "DVO"), ("CEB", "MNL"), ("DVO", "MNL"), ("ILO", "MNL")
-]
+def sign_in_available() -> bool:
+    """Whether `st.login` is configured (an [auth] section in secrets.toml)"""
+    try:
+        return "auth" in st.secrets
+    except FileNotFoundError:
+        return False
 
-# Enhanced session state initialization
-if 'price_locks' not in st.session_state:
-    st.session_state.price_locks = {}
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = traveler_id()
 if 'search_performed' not in st.session_state:
     st.session_state.search_performed = False
 if 'flights' not in st.session_state:
-    st.session_state.flights = []
+    st.session_state.flights = None
+if 'flights_frame' not in st.session_state:
+    st.session_state.flights_frame = None
+if 'sort_orders' not in st.session_state:
+    st.session_state.sort_orders = {}
+if 'result_fingerprint' not in st.session_state:
+    st.session_state.result_fingerprint = None
+if 'result_summary' not in st.session_state:
+    st.session_state.result_summary = None
+if 'fare_matrix' not in st.session_state:
+    st.session_state.fare_matrix = []
+if 'searched_date' not in st.session_state:
+    st.session_state.searched_date = None
+if 'searched_passengers' not in st.session_state:
+    st.session_state.searched_passengers = 1
+if 'results_page' not in st.session_state:
+    st.session_state.results_page = 0
+if 'round_trip_legs' not in st.session_state:
+    st.session_state.round_trip_legs = None
 if 'user_preferences' not in st.session_state:
     st.session_state.user_preferences = {
         'preferred_airlines': [],
@@ -253,245 +101,111 @@ if 'user_preferences' not in st.session_state:
         'eco_conscious': False,
         'frequent_routes': []
     }
-if 'search_history' not in st.session_state:
-    st.session_state.search_history = []
-if 'price_alerts' not in st.session_state:
-    st.session_state.price_alerts = []
+if 'alert_notifications' not in st.session_state:
+    st.session_state.alert_notifications = []
 if 'anti_manipulation_score' not in st.session_state:
-    st.session_state.anti_manipulation_score = random.randint(85, 98)
+    st.session_state.anti_manipulation_score = int(session_rng(st.session_state.session_id).integers(85, 99))
 
-# Advanced utility functions
-def calculate_carbon_footprint(distance_km: float, aircraft: str) -> float:
-    """Calculate CO2 emissions for flight"""
-    base_emission = distance_km * 0.15  # kg CO2 per km
-    aircraft_multipliers = {
-        "Airbus A320": 1.0,
-        "Boeing 737": 1.05,
-        "ATR 72": 0.8
-    }
-    return base_emission * aircraft_multipliers.get(aircraft, 1.0)
+# Process-wide resources shared by every session
+@st.cache_resource
+def get_search_executor() -> Executor:
+    """Thread pool shared by every session for search pipeline stages"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="cheepnow-search")
 
-def generate_price_trend() -> str:
-    """Generate realistic price trend"""
-    trends = ["stable", "rising", "falling"]
-    weights = [0.6, 0.25, 0.15]  # Most prices are stable
-    return random.choices(trends, weights=weights)[0]
+@st.cache_resource
+def get_search_cache() -> SearchCache:
+    """Search result cache shared by every session in this process"""
+    return SearchCache()
 
-def simulate_anti_manipulation() -> Dict:
-    """Simulate anti-price manipulation detection"""
-    techniques = [
-        "Cookie bypass active",
-        "User agent rotation",
-        "IP geolocation masking",
-        "Search pattern randomization",
-        "Cache avoidance enabled"
-    ]
-    
-    return {
-        'techniques_used': random.sample(techniques, 3),
-        'manipulation_attempts_blocked': random.randint(2, 8),
-        'clean_pricing_confidence': random.uniform(0.92, 0.99),
-        'price_inflation_prevented': random.uniform(200, 800)
-    }
+@st.cache_resource
+def get_price_history_store() -> PriceHistoryStore:
+    """Observed fare history shared by every session in this process"""
+    return PriceHistoryStore()
 
-def generate_enhanced_mock_flights(origin: str, destination: str, departure_date: str, passengers: int) -> List[Flight]:
-    """Generate highly realistic mock flight data with advanced features"""
-    flights = []
-    
-    # Calculate distance for carbon footprint
-    distances = {
-        ("MNL", "CEB"): 630, ("MNL", "DVO"): 970, ("MNL", "ILO"): 460,
-        ("CEB", "DVO"): 380, ("CEB", "MNL"): 630, ("DVO", "MNL"): 970,
-        ("MNL", "BCD"): 480, ("MNL", "TAG"): 660, ("MNL", "KLO"): 390,
-        ("MNL", "PPS"): 590
-    }
-    
-    distance = distances.get((origin, destination), 500)
-    
-    # Enhanced base prices with seasonal variation
-    base_prices = {
-        ("MNL", "CEB"): 3500, ("MNL", "DVO"): 4200, ("MNL", "ILO"): 2800,
-        ("CEB", "DVO"): 3200, ("CEB", "MNL"): 3500, ("DVO", "MNL"): 4200,
-        ("MNL", "BCD"): 2900, ("MNL", "TAG"): 3400, ("MNL", "KLO"): 2600,
-        ("MNL", "PPS"): 3800
-    }
-    
-    base_price = base_prices.get((origin, destination), 3000)
-    
-    # Add seasonal pricing (simulate peak/off-peak)
-    date_obj = datetime.strptime(departure_date, "%Y-%m-%d")
-    is_peak_season = date_obj.month in [12, 1, 3, 4, 5]  # Christmas, Summer
-    seasonal_multiplier = 1.3 if is_peak_season else 1.0
-    
-    # Generate flights for each airline
-    for airline_code, airline in AIRLINES.items():
-        if airline.type == "regional" and distance > 600:
-            continue  # Regional airlines for shorter routes only
-            
-        # Generate 1-3 flights per airline
-        num_flights = random.randint(1, 3) if airline.type != "regional" else random.randint(1, 2)
-        
-        for flight_num in range(1, num_flights + 1):
-            # Advanced pricing algorithm
-            base_flight_price = base_price * seasonal_multiplier
-            
-            # Airline-specific pricing
-            airline_multipliers = {
-                "budget": random.uniform(0.8, 1.1),
-                "low-cost": random.uniform(0.85, 1.15), 
-                "full-service": random.uniform(1.1, 1.4),
-                "regional": random.uniform(1.2, 1.5)
-            }
-            
-            price_multiplier = airline_multipliers[airline.type]
-            
-            # Dynamic pricing based on demand
-            demand_multiplier = random.uniform(0.9, 1.6)
-            
-            # Time-based pricing (early morning/late night cheaper)
-            departure_hour = random.randint(5, 23)
-            time_multiplier = 0.9 if departure_hour < 8 or departure_hour > 20 else 1.0
-            
-            flight_base_price = base_flight_price * price_multiplier * demand_multiplier * time_multiplier
-            taxes = flight_base_price * 0.12  # 12% VAT
-            total_price = flight_base_price + taxes
-            
-            # Generate realistic flight schedule
-            departure_minute = random.choice([0, 15, 30, 45])
-            duration = max(90, int(distance / 8) + random.randint(-20, 30))  # Realistic duration
-            
-            departure_time = f"{departure_hour:02d}:{departure_minute:02d}"
-            arrival_hour = (departure_hour + duration // 60) % 24
-            arrival_minute = (departure_minute + duration % 60) % 60
-            arrival_time = f"{arrival_hour:02d}:{arrival_minute:02d}"
-            
-            # Aircraft selection based on route distance
-            aircraft_options = ["Airbus A320", "Boeing 737"] if distance > 400 else ["ATR 72", "Airbus A320"]
-            aircraft = random.choice(aircraft_options)
-            
-            # Calculate carbon emissions
-            carbon_emissions = calculate_carbon_footprint(distance, aircraft)
-            
-            # Generate price history
-            price_history = []
-            for i in range(7):  # Past 7 days
-                historical_date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-                historical_price = total_price * random.uniform(0.85, 1.15)
-                demand_levels = ["Low", "Medium", "High"]
-                demand = random.choice(demand_levels)
-                price_history.append(PriceHistory(historical_date, historical_price, demand))
-            
-            flight = Flight(
-                id=f"{airline_code}{flight_num}{random.randint(100, 999)}",
-                flight_number=f"{airline_code} {flight_num}{random.randint(10, 99)}",
-                airline=airline,
-                departure_airport=AIRPORTS[origin],
-                arrival_airport=AIRPORTS[destination],
-                departure_time=departure_time,
-                arrival_time=arrival_time,
-                duration_minutes=duration,
-                base_price=flight_base_price,
-                taxes=taxes,
-                total_price=total_price,
-                seats_available=random.randint(3, 45),
-                aircraft=aircraft,
-                price_trend=generate_price_trend(),
-                carbon_emissions=carbon_emissions,
-                price_history=price_history
-            )
-            
-            # Calculate value score
-            flight.value_score = calculate_value_score(flight, flights)
-            flight.recommendation_reason = generate_recommendation_reason(flight)
-            
-            flights.append(flight)
-    
-    # Sort by value score (best first)
-    return sorted(flights, key=lambda x: x.value_score, reverse=True)
+@st.cache_resource
+def get_fanout_executor() -> Executor:
+    """Thread pool for requests that fan out into several cached searches (flexible dates, round trips)"""
+    return ThreadPoolExecutor(max_workers=2 * FLEXIBLE_DATE_DAYS + 1, thread_name_prefix="cheepnow-fanout")
 
-def calculate_value_score(flight: Flight, existing_flights: List[Flight]) -> float:
-    """Calculate comprehensive value score for flight"""
-    max_price = max([f.total_price for f in existing_flights], default=flight.total_price) + 1000
-    min_price = min([f.total_price for f in existing_flights], default=flight.total_price) - 1000
-    
-    # Price score (lower price = higher score)
-    price_score = (max_price - flight.total_price) / (max_price - min_price) * 40
-    
-    # Airline features score
-    feature_score = 0
-    if flight.airline.carry_on_included:
-        feature_score += 15
-    if flight.airline.checked_baggage_included:
-        feature_score += 10
-    if flight.airline.wifi_available:
-        feature_score += 5
-    if flight.airline.meal_service:
-        feature_score += 5
-    
-    # On-time performance score
-    performance_score = flight.airline.on_time_performance * 15
-    
-    # Customer rating score
-    rating_score = (flight.airline.customer_rating / 5.0) * 10
-    
-    # Environmental score (lower emissions = higher score)
-    env_score = max(0, 10 - (flight.carbon_emissions / 100))
-    
-    # Schedule convenience (prefer mid-day flights)
-    hour = int(flight.departure_time.split(':')[0])
-    schedule_score = 5 if 8 <= hour <= 18 else 2
-    
-    total_score = price_score + feature_score + performance_score + rating_score + env_score + schedule_score
-    return min(100, max(0, total_score))
+@st.cache_resource
+def get_storage_backend():
+    """Storage backend shared by every session in this process"""
+    return create_storage_backend()
 
-def generate_recommendation_reason(flight: Flight) -> str:
-    """Generate personalized recommendation reason"""
-    reasons = []
-    
-    if flight.airline.on_time_performance > 0.85:
-        reasons.append("excellent punctuality")
-    if flight.airline.carry_on_included and flight.airline.checked_baggage_included:
-        reasons.append("all baggage included")
-    if flight.carbon_emissions < 80:
-        reasons.append("eco-friendly choice")
-    if flight.airline.customer_rating > 4.0:
-        reasons.append("high customer satisfaction")
-    if flight.price_trend == "falling":
-        reasons.append("price trending down")
-    
-    if not reasons:
-        reasons = ["competitive pricing"]
-    
-    return f"Recommended for {random.choice(reasons)}"
+if 'search_history' not in st.session_state:
+    st.session_state.search_history = get_storage_backend().load_search_history(st.session_state.session_id)
 
-def lock_price(flight: Flight) -> None:
-    """Lock flight price for 15 minutes"""
-    lock_time = datetime.now() + timedelta(minutes=15)
-    st.session_state.price_locks[flight.id] = {
-        'flight': flight,
-        'locked_until': lock_time,
-        'original_price': flight.total_price
-    }
+@st.cache_resource
+def get_price_alert_engine() -> PriceAlertEngine:
+    """Price alerts shared by every session, checked against every fresh search, restored from storage"""
+    return PriceAlertEngine(get_storage_backend())
 
-def is_price_locked(flight_id: str) -> bool:
-    """Check if flight price is still locked"""
-    if flight_id not in st.session_state.price_locks:
-        return False
-    
-    lock_info = st.session_state.price_locks[flight_id]
-    return datetime.now() < lock_info['locked_until']
+@st.cache_resource
+def get_price_lock_store() -> PriceLockStore:
+    """Price lock store shared by every session in this process, restored from storage"""
+    return PriceLockStore(get_storage_backend())
 
-def get_lock_time_remaining(flight_id: str) -> int:
-    """Get remaining lock time in seconds"""
-    if not is_price_locked(flight_id):
-        return 0
-    
-    lock_info = st.session_state.price_locks[flight_id]
-    remaining = lock_info['locked_until'] - datetime.now()
-    return max(0, int(remaining.total_seconds()))
+# Price locks held by the current session
+def lock_price(flight: FlightView, now: float) -> bool:
+    """Lock flight price for 15 minutes; returns False if another traveler holds the fare"""
+    lock = get_price_lock_store().acquire(fare_key(flight), st.session_state.session_id, flight, now)
+    return lock is not None
+
+def get_price_lock(flight: FlightView, now: float) -> Optional[PriceLock]:
+    """Active lock on this fare held by any traveler"""
+    return get_price_lock_store().get(fare_key(flight), now)
+
+def is_price_locked(flight: FlightView, now: float) -> bool:
+    """Check if the current traveler holds a lock on this fare"""
+    lock = get_price_lock(flight, now)
+    return lock is not None and lock.owner == st.session_state.session_id
+
+# Price alerts set by the current traveler
+def set_price_alert(origin: str, destination: str, threshold: float, departure_date: Optional[str] = None,
+                    flight_number: Optional[str] = None) -> PriceAlert:
+    """Alert this traveler once a matching fare drops below `threshold`"""
+    return get_price_alert_engine().add(st.session_state.session_id, origin, destination, threshold,
+                                        departure_date=departure_date, flight_number=flight_number)
+
+def cancel_price_alert(alert_id: str) -> None:
+    get_price_alert_engine().remove(alert_id)
+
+def collect_price_alert_notifications() -> None:
+    """Move this traveler's fired alerts from the shared engine into the session and toast them"""
+    matches = get_price_alert_engine().take_notifications(st.session_state.session_id)
+    if not matches:
+        return
+    for match in matches:
+        flight = match.flight
+        message = (f"🔔 {flight.flight_number} {flight.departure_airport.code}→{flight.arrival_airport.code} "
+                   f"on {flight.departure_date} dropped to ₱{match.price:,.0f} (alert below ₱{match.alert.threshold:,.0f})")
+        st.session_state.alert_notifications.append(message)
+        st.toast(message)
+
+# Search form callbacks
+def swap_route() -> None:
+    st.session_state.origin, st.session_state.destination = st.session_state.destination, st.session_state.origin
+
+# Results list pagination
+def reset_results_page() -> None:
+    st.session_state.results_page = 0
+
+def change_results_page(step: int) -> None:
+    st.session_state.results_page += step
+
+# Chart figures, cached per result set
+@st.cache_resource
+def get_figure_cache():
+    """Figure cache shared by every session in this process.
+
+    Plotly is imported here rather than at startup, so it only loads once
+    the first set of results is rendered.
+    """
+    from cheepnow.charts import FigureCache
+    return FigureCache()
 
 # Enhanced header with anti-manipulation showcase
-def render_header():
+def render_header(now: float):
     """Render enhanced header with real-time anti-manipulation stats"""
     
     # Custom CSS for animations and styling
@@ -582,7 +296,7 @@ def render_header():
     """, unsafe_allow_html=True)
     
     # Anti-manipulation status banner
-    manipulation_data = simulate_anti_manipulation()
+    manipulation_data = simulate_anti_manipulation(session_rng(st.session_state.session_id, epoch_bucket(now)))
     
     col1, col2 = st.columns([2, 1])
     
@@ -611,8 +325,8 @@ def render_header():
         """, unsafe_allow_html=True)
     
     with col2:
-        if st.session_state.price_locks:
-            active_locks = sum(1 for fid in st.session_state.price_locks if is_price_locked(fid))
+        active_locks = get_price_lock_store().count(st.session_state.session_id)
+        if active_locks:
             st.markdown(f"""
             <div class="price-lock-indicator">
                 🔒 {active_locks} Price Lock{'s' if active_locks != 1 else ''} Active
@@ -628,14 +342,73 @@ def render_header():
             </div>
             """, unsafe_allow_html=True)
 
+# Hidden performance panel, shown with CHEEPNOW_PERF set or ?perf=1 in the URL
+def toggle_perf_recording() -> None:
+    PERF_RECORDER.enabled = st.session_state.perf_recording
+
+def render_performance_panel():
+    """Sidebar expander with per-stage latency histograms recorded across all sessions"""
+    if not (os.environ.get(PERF_ENV) or st.query_params.get("perf")):
+        return
+    with st.sidebar.expander("⏱️ Performance"):
+        st.checkbox("Record stage timings", value=PERF_RECORDER.enabled, key="perf_recording",
+                    on_change=toggle_perf_recording, help="Shared by every session in this server process")
+        snapshot = PERF_RECORDER.snapshot()
+        if snapshot['stages']:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Stage': stage,
+                        'Count': stats['count'],
+                        'Mean (ms)': stats['mean'] * 1000,
+                        'p50 (ms)': stats['p50'] * 1000,
+                        'p95 (ms)': stats['p95'] * 1000,
+                        'p99 (ms)': stats['p99'] * 1000,
+                        'Max (ms)': stats['max'] * 1000
+                    }
+                    for stage, stats in snapshot['stages'].items()
+                ]).round(2),
+                hide_index=True,
+                use_container_width=True
+            )
+            st.caption("Percentiles are histogram bucket upper bounds.")
+        else:
+            st.caption("No timings recorded yet.")
+        
+        json_col, prometheus_col = st.columns(2)
+        with json_col:
+            st.download_button("JSON", PERF_RECORDER.to_json(snapshot), file_name="cheepnow-perf.json",
+                               mime="application/json", use_container_width=True)
+        with prometheus_col:
+            st.download_button("Prometheus", PERF_RECORDER.to_prometheus(snapshot), file_name="cheepnow-perf.prom",
+                               mime="text/plain", use_container_width=True)
+        if st.button("Reset timings", use_container_width=True):
+            PERF_RECORDER.reset()
+            st.rerun()
+
 # Main App Layout with enhanced features
 def main():
-    render_header()
+    # One clock read per render; expired locks are purged before anything reads them
+    now = time.time()
+    get_price_lock_store().purge(now)
+    collect_price_alert_notifications()
+    
+    with perf_timer('render.header'):
+        render_header(now)
     
     # Enhanced sidebar with multiple sections
-    with st.sidebar:
+    with st.sidebar, perf_timer('render.sidebar'):
         st.header("🔍 Flight Search & Preferences")
         
+        # Signing in keeps locks, alerts and search history across visits
+        if sign_in_available():
+            if st.user.get("is_logged_in"):
+                st.caption(f"Signed in as {st.user.get('email') or st.user.get('name') or 'traveler'}")
+                if st.button("Sign out", key="sign_out"):
+                    st.logout()
+            elif st.button("🔑 Sign in to keep your locks and alerts", key="sign_in"):
+                st.login()
+        
         # User preferences section
         with st.expander("⚙️ Search Preferences", expanded=False):
             st.subheader("Personalize Your Search")
@@ -719,12 +492,8 @@ def main():
         with col3:
             # Swap button (outside form)
             st.write("") # Add spacing
-            if st.button("🔄 Swap", help="Swap origin and destination", use_container_width=True):
-                # Swap the values by updating session state and triggering rerun
-                temp_origin = origin
-                st.session_state.origin = destination
-                st.session_state.destination = temp_origin
-                st.rerun()
+            # Swapping in a callback updates the widget keys before the selectboxes are rebuilt
+            st.button("🔄 Swap", help="Swap origin and destination", on_click=swap_route, use_container_width=True)
         
         with st.form("flight_search"):
             
@@ -740,6 +509,7 @@ def main():
             # Trip type with round trip option
             trip_type = st.radio("✈️ Trip Type", ["One Way", "Round Trip"])
             
+            return_date = None
             if trip_type == "Round Trip":
                 return_date = st.date_input(
                     "📅 Return Date",
@@ -786,36 +556,46 @@ def main():
             )
         
         # Enhanced price locks section
-        if st.session_state.price_locks:
+        my_locks = get_price_lock_store().owned_by(st.session_state.session_id)
+        if my_locks:
             st.divider()
             st.subheader("🔒 Active Price Locks")
             
-            active_locks = [(fid, info) for fid, info in st.session_state.price_locks.items() 
-                          if is_price_locked(fid)]
-            
-            if active_locks:
-                for flight_id, lock_info in active_locks:
-                    remaining = get_lock_time_remaining(flight_id)
-                    if remaining > 0:
-                        minutes = remaining // 60
-                        seconds = remaining % 60
-                        
-                        # Create a more detailed lock display
-                        with st.container():
-                            st.markdown(f"""
-                            <div style="background: linear-gradient(45deg, #FFD700, #FFA500); 
-                                        padding: 1rem; border-radius: 10px; margin: 0.5rem 0;">
-                                <strong>✈️ {lock_info['flight'].flight_number}</strong><br>
-                                <strong>⏰ {minutes:02d}:{seconds:02d}</strong> remaining<br>
-                                <strong>💰 ₱{lock_info['original_price']:,.0f}</strong> locked<br>
-                                <small>{lock_info['flight'].departure_airport.city} → {lock_info['flight'].arrival_airport.city}</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            if st.button(f"📧 Get Price Alert", key=f"alert_{flight_id}"):
-                                st.success("✅ Price alert set! We'll notify you of any changes.")
-            else:
-                st.info("No active price locks. Lock prices to protect against increases!")
+            for lock in my_locks:
+                remaining = get_lock_time_remaining(lock, now)
+                minutes = remaining // 60
+                seconds = remaining % 60
+                
+                # Create a more detailed lock display
+                with st.container():
+                    st.markdown(f"""
+                    <div style="background: linear-gradient(45deg, #FFD700, #FFA500); 
+                                padding: 1rem; border-radius: 10px; margin: 0.5rem 0;">
+                        <strong>✈️ {lock.flight_number}</strong><br>
+                        <strong>⏰ {minutes:02d}:{seconds:02d}</strong> remaining<br>
+                        <strong>💰 ₱{lock.original_price:,.0f}</strong> locked<br>
+                        <small>{AIRPORTS[lock.origin].city} → {AIRPORTS[lock.destination].city}</small>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    if st.button(f"📧 Get Price Alert", key=f"alert_{lock.fare_key}"):
+                        set_price_alert(lock.origin, lock.destination, lock.original_price,
+                                        departure_date=lock.departure_date, flight_number=lock.flight_number)
+                        st.success(f"✅ Price alert set! We'll notify you if this fare drops below ₱{lock.original_price:,.0f}.")
+        
+        # Price alerts
+        my_alerts = get_price_alert_engine().alerts_for(st.session_state.session_id)
+        if my_alerts or st.session_state.alert_notifications:
+            st.divider()
+            st.subheader("🔔 Price Alerts")
+            for alert in my_alerts:
+                scope = alert.flight_number or "Any flight"
+                when = alert.departure_date or "any date"
+                st.caption(f"{scope} · {alert.origin}→{alert.destination} · {when} · below ₱{alert.threshold:,.0f}")
+                st.button("✖️ Cancel", key=f"cancel_alert_{alert.alert_id}",
+                          on_click=cancel_price_alert, args=(alert.alert_id,))
+            for message in st.session_state.alert_notifications[-3:]:
+                st.info(message)
         
         # Search history
         if st.session_state.search_history:
@@ -826,29 +606,6 @@ def main():
     
     # Main content area with enhanced features
     if search_clicked and origin != destination:
-        # Enhanced anti-manipulation simulation
-        with st.spinner("🛡️ Activating anti-manipulation shields..."):
-            manipulation_data = simulate_anti_manipulation()
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            steps = [
-                "Clearing tracking cookies...",
-                "Rotating user agents...",
-                "Masking location data...",
-                "Randomizing search patterns...",
-                "Bypassing price inflation algorithms...",
-                "Fetching clean pricing data..."
-            ]
-            
-            for i, step in enumerate(steps):
-                status_text.text(step)
-                progress_bar.progress((i + 1) / len(steps))
-                time_module.sleep(0.3)
-            
-            status_text.text("✅ Anti-manipulation protection active!")
-            time_module.sleep(0.5)
-        
         # Store search in history
         search_record = {
             'route': f"{AIRPORTS[origin].city} → {AIRPORTS[destination].city}",
@@ -856,12 +613,56 @@ def main():
             'timestamp': datetime.now().isoformat()
         }
         st.session_state.search_history.append(search_record)
+        get_storage_backend().append_search(st.session_state.session_id, search_record)
         
-        with st.spinner("🔍 Searching for the best flight deals..."):
-            flights = generate_enhanced_mock_flights(origin, destination, str(departure_date), passengers)
-            st.session_state.flights = flights
+        with st.spinner("🔍 Searching for the best flight deals..."), perf_timer('render.search'):
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            
+            def show_progress(message: str, fraction: float) -> None:
+                status_text.text(message)
+                progress_bar.progress(fraction)
+            
+            if flexible_dates:
+                day_results = search_flexible_dates(
+                    origin, destination, str(departure_date),
+                    get_fanout_executor(), get_search_executor(), get_search_cache(),
+                    earliest=str(today), on_progress=show_progress, now=now, history=get_price_history_store(),
+                    alerts=get_price_alert_engine()
+                )
+                result, from_cache = day_results[str(departure_date)], False
+                st.session_state.fare_matrix = build_fare_matrix(day_results)
+            else:
+                result, from_cache = search_flights(
+                    origin, destination, str(departure_date),
+                    get_search_executor(), get_search_cache(), on_progress=show_progress, now=now,
+                    history=get_price_history_store(), alerts=get_price_alert_engine()
+                )
+                st.session_state.fare_matrix = []
+            st.session_state.searched_date = str(departure_date)
+            st.session_state.searched_passengers = passengers
+            
+            if return_date is not None:
+                status_text.text("Searching return flights...")
+                outbound_result, return_result = search_round_trip(
+                    origin, destination, str(departure_date), str(return_date),
+                    get_fanout_executor(), get_search_executor(), get_search_cache(), now=now,
+                    history=get_price_history_store(), alerts=get_price_alert_engine()
+                )
+                st.session_state.round_trip_legs = (outbound_result.flights, return_result.flights)
+            else:
+                st.session_state.round_trip_legs = None
+            manipulation_data = result.manipulation_data
+            st.session_state.flights = result.flights
+            st.session_state.flights_frame = result.frame
+            st.session_state.sort_orders = result.sort_orders
+            st.session_state.result_fingerprint = result.fingerprint
+            st.session_state.result_summary = result.summary
             st.session_state.search_performed = True
-            time_module.sleep(1)
+            st.session_state.results_page = 0
+            flights = result.flights
+            status_text.text("✅ Anti-manipulation protection active!")
+        collect_price_alert_notifications()
         
         # Success message with savings info
         savings_protected = manipulation_data['price_inflation_prevented']
@@ -870,10 +671,13 @@ def main():
         
         🛡️ **Protected you from ₱{savings_protected:.0f} in price manipulation**
         """)
+        if from_cache:
+            st.caption("⚡ Served from the shared fare cache")
     
     # Enhanced search results display
-    if st.session_state.search_performed and st.session_state.flights:
+    if st.session_state.search_performed and st.session_state.flights is not None and len(st.session_state.flights):
         flights = st.session_state.flights
+        summary = st.session_state.result_summary
         
         # Enhanced summary metrics with better layout
         st.subheader("📊 Flight Search Summary")
@@ -881,179 +685,180 @@ def main():
         col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
-            st.metric("✈️ Flights Found", len(flights))
+            st.metric("✈️ Flights Found", summary.count)
         
         with col2:
-            cheapest = min(flights, key=lambda x: x.total_price)
-            st.metric("💰 Cheapest", f"₱{cheapest.total_price:,.0f}")
+            cheapest = flights[summary.cheapest]
+            party = st.session_state.searched_passengers
+            st.metric("💰 Cheapest", f"₱{cheapest.total_price:,.0f}",
+                      help=f"Per passenger; ₱{cheapest.total_price * party:,.0f} for {party} passengers" if party > 1 else None)
         
         with col3:
-            avg_price = sum(f.total_price for f in flights) / len(flights)
-            st.metric("📊 Average Price", f"₱{avg_price:,.0f}")
+            st.metric("📊 Average Price", f"₱{summary.average_price:,.0f}")
         
         with col4:
-            carry_on_included = sum(1 for f in flights if f.airline.carry_on_included)
-            st.metric("🎒 Carry-on Included", f"{carry_on_included}/{len(flights)}")
+            st.metric("🎒 Carry-on Included", f"{summary.carry_on_included}/{summary.count}")
         
         with col5:
-            avg_emissions = sum(f.carbon_emissions for f in flights) / len(flights)
-            st.metric("🌱 Avg CO₂", f"{avg_emissions:.0f}kg")
+            st.metric("🌱 Avg CO₂", f"{summary.average_emissions:.0f}kg")
+        
+        # Top flights by price, value and CO₂
+        with st.expander(f"🏅 Top {len(summary.leaders['price'])} by price, value and CO₂"):
+            leader_cols = st.columns(len(SUMMARY_LEADERS))
+            for col, (leader, label) in zip(leader_cols, SUMMARY_LEADERS.items()):
+                with col:
+                    st.markdown(f"**{label}**")
+                    for row in summary.leaders[leader].tolist():
+                        leader_flight = flights[row]
+                        st.caption(f"{leader_flight.flight_number} • {leader_flight.departure_time} • "
+                                   f"₱{leader_flight.total_price:,.0f} • ⭐ {leader_flight.value_score:.0f} • "
+                                   f"{leader_flight.carbon_emissions:.0f}kg")
+        
+        # Route-wide price alert for the searched date
+        alert_origin, alert_destination = flights[0].departure_airport.code, flights[0].arrival_airport.code
+        alert_col, alert_button_col = st.columns([3, 1])
+        with alert_col:
+            alert_threshold = st.number_input(
+                f"🔔 Alert me when any {alert_origin}→{alert_destination} fare on {st.session_state.searched_date} drops below (₱)",
+                min_value=0.0, value=float(round(cheapest.total_price * 0.95, -1)), step=100.0, key="route_alert_threshold"
+            )
+        with alert_button_col:
+            st.write("")
+            if st.button("🔔 Set Route Alert", key="route_alert"):
+                set_price_alert(alert_origin, alert_destination, alert_threshold,
+                                departure_date=st.session_state.searched_date)
+                st.success(f"✅ We'll notify you when a fare drops below ₱{alert_threshold:,.0f}.")
+        
+        # Flexible dates fare matrix
+        if st.session_state.fare_matrix:
+            st.subheader("📅 Flexible Dates (±3 days)")
+            
+            fare_matrix = st.session_state.fare_matrix
+            selected = next((c for c in fare_matrix if c.date == st.session_state.searched_date), None)
+            cheapest_day = min(fare_matrix, key=lambda c: c.cheapest_price)
+            
+            matrix_cols = st.columns(len(fare_matrix))
+            for col, cell in zip(matrix_cols, fare_matrix):
+                with col:
+                    label = datetime.strptime(cell.date, "%Y-%m-%d").strftime("%a %d %b")
+                    if cell.date == st.session_state.searched_date:
+                        label = f"📍 {label}"
+                    elif cell is cheapest_day:
+                        label = f"💰 {label}"
+                    delta = None
+                    if selected is not None and cell is not selected:
+                        difference = cell.cheapest_price - selected.cheapest_price
+                        delta = f"{'+' if difference >= 0 else '-'}₱{abs(difference):,.0f}"
+                    st.metric(label, f"₱{cell.cheapest_price:,.0f}", delta=delta, delta_color="inverse")
+                    st.caption(f"⭐ Best value {cell.best_value_score:.0f} • {cell.flights_found} flights")
+            
+            if selected is not None and cheapest_day is not selected:
+                savings = selected.cheapest_price - cheapest_day.cheapest_price
+                st.info(f"💡 Flying on {cheapest_day.date} saves you ₱{savings:,.0f} on the cheapest fare.")
+        
+        # Round-trip combinations
+        if st.session_state.round_trip_legs:
+            st.subheader("🔁 Best Round-Trip Combinations")
+            
+            rank_by = st.radio(
+                "Rank combinations by",
+                options=list(ROUND_TRIP_RANKINGS.keys()),
+                format_func=lambda x: ROUND_TRIP_RANKINGS[x],
+                horizontal=True,
+                key="round_trip_rank_by"
+            )
+            outbound_flights, return_flights = st.session_state.round_trip_legs
+            options = rank_round_trips(outbound_flights, return_flights, rank_by=rank_by)
+            
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Outbound': f"{o.outbound.flight_number} • {o.outbound.departure_time}",
+                        'Return': f"{o.inbound.flight_number} • {o.inbound.departure_time}",
+                        'Airlines': f"{o.outbound.airline.name} / {o.inbound.airline.name}",
+                        'Total Price': f"₱{o.total_price:,.0f}",
+                        'Combined Value': round(o.combined_score, 1)
+                    }
+                    for o in options
+                ]),
+                hide_index=True,
+                use_container_width=True
+            )
         
         # Enhanced visualizations
         st.subheader("📈 Advanced Price Analysis")
+        frame = st.session_state.flights_frame
         
         # Create tabs for different views
         tab1, tab2, tab3, tab4 = st.tabs(["💰 Price Comparison", "⏰ Timeline View", "🌱 Environmental Impact", "📊 Airline Analysis"])
         
-        with tab1:
+        figure_cache = get_figure_cache()
+        fingerprint = st.session_state.result_fingerprint
+        
+        with tab1, perf_timer('render.tab.price'):
             # Enhanced price comparison chart
-            chart_data = pd.DataFrame([
-                {
-                    'Airline': f.airline.name,
-                    'Price': f.total_price,
-                    'Flight': f.flight_number,
-                    'Carry-on': '✅ Included' if f.airline.carry_on_included else '❌ Extra fee',
-                    'Type': f.airline.type.title(),
-                    'On-time Performance': f.airline.on_time_performance * 100,
-                    'Customer Rating': f.airline.customer_rating,
-                    'Value Score': f.value_score,
-                    'Price Trend': f.price_trend
-                }
-                for f in flights
-            ])
-            
-            fig = px.scatter(
-                chart_data, 
-                x='Airline', 
-                y='Price',
-                color='Value Score',
-                size='Customer Rating',
-                hover_data=['Flight', 'Carry-on', 'On-time Performance'],
-                title="Flight Prices with Value Scoring",
-                color_continuous_scale='RdYlGn'
-            )
-            fig.update_layout(height=500)
+            fig = figure_cache.get_figure(fingerprint, 'price', frame)
             st.plotly_chart(fig, use_container_width=True)
         
-        with tab2:
+        with tab2, perf_timer('render.tab.timeline'):
             # Timeline view of departures
-            timeline_data = pd.DataFrame([
-                {
-                    'Time': f.departure_time,
-                    'Airline': f.airline.name,
-                    'Price': f.total_price,
-                    'Duration': f"{f.duration_minutes // 60}h {f.duration_minutes % 60}m",
-                    'Aircraft': f.aircraft
-                }
-                for f in flights
-            ])
-            
-            fig_timeline = px.scatter(
-                timeline_data,
-                x='Time',
-                y='Price', 
-                color='Airline',
-                size=[100] * len(timeline_data),
-                hover_data=['Duration', 'Aircraft'],
-                title="Flight Prices by Departure Time"
-            )
+            fig_timeline = figure_cache.get_figure(fingerprint, 'timeline', frame)
             st.plotly_chart(fig_timeline, use_container_width=True)
         
-        with tab3:
+        with tab3, perf_timer('render.tab.eco'):
             # Environmental impact analysis
-            eco_data = pd.DataFrame([
-                {
-                    'Airline': f.airline.name,
-                    'CO₂ Emissions (kg)': f.carbon_emissions,
-                    'Price': f.total_price,
-                    'Efficiency Score': 100 - (f.carbon_emissions / max(flight.carbon_emissions for flight in flights)) * 100
-                }
-                for f in flights
-            ])
-            
-            fig_eco = px.bar(
-                eco_data,
-                x='Airline',
-                y='CO₂ Emissions (kg)',
-                color='Efficiency Score',
-                title="Environmental Impact by Airline",
-                color_continuous_scale='RdYlGn'
-            )
+            fig_eco = figure_cache.get_figure(fingerprint, 'eco', frame)
             st.plotly_chart(fig_eco, use_container_width=True)
             
             # Eco-friendly recommendations
-            eco_flight = min(flights, key=lambda x: x.carbon_emissions)
+            eco_flight = flights[summary.eco]
             st.success(f"""
             🌱 **Most Eco-Friendly Option**: {eco_flight.flight_number} - {eco_flight.airline.name}
             
             Only {eco_flight.carbon_emissions:.0f}kg CO₂ emissions • ₱{eco_flight.total_price:,.0f}
             """)
         
-        with tab4:
+        with tab4, perf_timer('render.tab.airline_radar'):
             # Airline performance comparison
-            airline_stats = {}
-            for flight in flights:
-                airline = flight.airline.name
-                if airline not in airline_stats:
-                    airline_stats[airline] = {
-                        'avg_price': [],
-                        'on_time_perf': flight.airline.on_time_performance,
-                        'rating': flight.airline.customer_rating,
-                        'carry_on': flight.airline.carry_on_included,
-                        'checked_bag': flight.airline.checked_baggage_included
-                    }
-                airline_stats[airline]['avg_price'].append(flight.total_price)
-            
-            # Calculate averages
-            for airline in airline_stats:
-                airline_stats[airline]['avg_price'] = sum(airline_stats[airline]['avg_price']) / len(airline_stats[airline]['avg_price'])
-            
-            # Create comparison radar chart
-            airlines = list(airline_stats.keys())
-            categories = ['Price Score', 'On-time Performance', 'Customer Rating', 'Value Features']
-            
-            fig_radar = go.Figure()
-            
-            for airline in airlines:
-                stats = airline_stats[airline]
-                max_price = max(airline_stats[a]['avg_price'] for a in airline_stats)
-                price_score = (max_price - stats['avg_price']) / max_price * 100
-                
-                feature_score = 0
-                if stats['carry_on']: feature_score += 50
-                if stats['checked_bag']: feature_score += 50
-                
-                values = [
-                    price_score,
-                    stats['on_time_perf'] * 100,
-                    stats['rating'] * 20,
-                    feature_score
-                ]
-                
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=values,
-                    theta=categories,
-                    fill='toself',
-                    name=airline
-                ))
-            
-            fig_radar.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[0, 100]
-                    )),
-                showlegend=True,
-                title="Airline Performance Comparison"
-            )
+            fig_radar = figure_cache.get_figure(fingerprint, 'airline_radar', frame)
             
             st.plotly_chart(fig_radar, use_container_width=True)
         
         # Flight results table
         st.subheader("✈️ Available Flights")
         
-        for i, flight in enumerate(flights):
-            with st.container():
+        sort_col, size_col = st.columns([3, 1])
+        with sort_col:
+            sort_by = st.selectbox(
+                "Sort by",
+                options=list(RESULT_SORTS.keys()),
+                format_func=lambda x: RESULT_SORTS[x],
+                key="results_sort",
+                on_change=reset_results_page
+            )
+        with size_col:
+            page_size = st.selectbox("Per page", RESULT_PAGE_SIZES, key="results_page_size", on_change=reset_results_page)
+        
+        # Filter and sort the whole result set, then only turn the visible page into elements
+        preferences = st.session_state.user_preferences
+        # The departure index is only built once a time window needs it
+        window = DEPARTURE_TIME_WINDOWS.get(preferences['preferred_departure_time'])
+        departure_index = st.session_state.sort_orders.departure_index if window is not None else None
+        order = apply_preferences(flights, st.session_state.sort_orders, preferences, sort_by, departure_index)
+        start, stop, page, page_count = paginate(len(order), st.session_state.results_page, page_size)
+        st.session_state.results_page = page
+        if len(order):
+            filtered_note = f" ({len(flights) - len(order)} hidden by your preferences)" if len(order) < len(flights) else ""
+            st.caption(f"Showing {start + 1}–{stop} of {len(order)} flights{filtered_note}")
+        else:
+            if departure_index is not None and departure_index.count_between(*window) == 0:
+                st.info(f"No flights depart in the {preferences['preferred_departure_time']} window. Try widening the time window.")
+            else:
+                st.info("No flights match your search preferences. Try raising your budget or widening the time window.")
+        
+        for i, row in enumerate(order[start:stop], start=start):
+            flight = flights[int(row)]
+            with st.container(), perf_timer('render.card'):
                 # Create a bordered container for each flight
                 border_color = "🟢" if i == 0 else "🔵"  # Highlight cheapest
                 
@@ -1076,11 +881,14 @@ def main():
                     st.write(f"🛬 **{flight.arrival_time}**")
                     st.write(f"{flight.arrival_airport.city}")
                 
+                lock = get_price_lock(flight, now)
+                locked_by_me = lock is not None and lock.owner == st.session_state.session_id
+                
                 with col4:
                     # Price display
-                    if is_price_locked(flight.id):
+                    if locked_by_me:
                         st.success(f"🔒 **₱{flight.total_price:,.0f}** LOCKED")
-                        remaining = get_lock_time_remaining(flight.id)
+                        remaining = get_lock_time_remaining(lock, now)
                         minutes = remaining // 60
                         seconds = remaining % 60
                         st.write(f"⏰ {minutes:02d}:{seconds:02d} remaining")
@@ -1097,22 +905,39 @@ def main():
                     st.write(f"🧳 Checked: {checked}")
                 
                 with col5:
-                    if not is_price_locked(flight.id):
-                        if st.button(f"🔒 Lock Price", key=f"lock_{flight.id}", type="primary"):
-                            lock_price(flight)
-                            st.rerun()
-                    else:
+                    if locked_by_me:
                         st.success("🔒 Locked!")
+                    elif lock is not None:
+                        st.warning("🔒 Held by another traveler")
+                    elif st.button(f"🔒 Lock Price", key=f"lock_{flight.id}", type="primary"):
+                        if lock_price(flight, now):
+                            st.rerun()
+                        else:
+                            st.warning("Another traveler just locked this fare.")
                     
                     st.write(f"💺 {flight.seats_available} seats")
                 
                 st.divider()
         
+        if page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                st.button("◀ Previous", key="results_prev", on_click=change_results_page, args=(-1,),
+                          disabled=page == 0, use_container_width=True)
+            with page_col:
+                st.markdown(f"<div style='text-align: center; padding-top: 0.5rem;'>Page {page + 1} of {page_count}</div>",
+                            unsafe_allow_html=True)
+            with next_col:
+                st.button("Next ▶", key="results_next", on_click=change_results_page, args=(1,),
+                          disabled=page >= page_count - 1, use_container_width=True)
+        
         # Best value recommendation
         st.subheader("🏆 CheepNow Recommendation")
         
-        # Use the existing value scores that were already calculated
-        best_value = max(flights, key=lambda x: x.value_score)
+        # Best match for the traveler's preferences, falling back to the whole result set
+        recommended = apply_preferences(flights, st.session_state.sort_orders, preferences,
+                                        departure_index=departure_index)
+        best_value = flights[int(recommended[0]) if len(recommended) else summary.best_value]
         
         st.success(f"""
         **Best Value: {best_value.flight_number} - {best_value.airline.name}**
@@ -1138,4 +963,6 @@ def main():
     """)
 
 if __name__ == "__main__":
-    main()
+    with perf_timer('render.rerun'):
+        main()
+    render_performance_panel()
@@ -0,0 +1,247 @@
+"""Headless multi-session load test for the Streamlit app.
+
+Drives `app.py` through Streamlit's `AppTest` runner. Each user runs a
+realistic flow: open the app, pick a popular route, search, re-sort the
+results, page through them, lock a price, then swap the route and search
+again. Every step is one script rerun.
+
+Users are spread over `--processes` worker processes. Within a process they
+share the process-wide caches, executors and stores exactly as real
+sessions do, but AppTest can't overlap reruns in one process, so they take
+turns. Each step therefore records its service time (the rerun itself) and
+its queue wait separately: service-time percentiles are what one process
+costs per rerun, and 1 / mean service time is the rerun rate a process can
+sustain before latency grows. Reruns in different processes do overlap,
+like a multi-process deployment behind a load balancer.
+
+    python benchmarks/load_test.py --sessions 8 --flows 3
+    python benchmarks/load_test.py --sessions 32 --processes 4
+    python benchmarks/load_test.py --sessions 32 --max-p95-ms 400   # exit 1 if p95 service time is slower
+
+Reports p50/p95/p99 service time and end-to-end latency per step and
+overall, queue wait, reruns per second, per-process capacity and resident
+memory growth per session.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+sys.path.insert(0, APP_DIR)
+
+# AppTest logs a "missing ScriptRunContext" warning and deprecation notices on every rerun
+logging.disable(logging.WARNING)
+warnings.filterwarnings("ignore")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+RERUN_TIMEOUT_SECONDS = 120
+POPULAR_ROUTE_BUTTONS = 6  # route_0 .. route_5 in the sidebar
+
+# AppTest installs a process-global mock Runtime for the duration of each run and clears it
+# afterwards, so runs from different sessions in one process can't overlap. Sessions queue for
+# this lock; the wait is recorded apart from the rerun's own service time.
+_RERUN_LOCK = threading.Lock()
+
+@dataclass
+class SessionReport:
+    session: int
+    latencies: Dict[str, List[float]] = field(default_factory=dict)  # queue wait + service time
+    service: Dict[str, List[float]] = field(default_factory=dict)  # the rerun alone
+    errors: List[str] = field(default_factory=list)
+
+    def record(self, step: str, seconds: float, service_seconds: float) -> None:
+        self.latencies.setdefault(step, []).append(seconds)
+        self.service.setdefault(step, []).append(service_seconds)
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process; falls back to the peak RSS off Linux"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def _step(at: AppTest, report: SessionReport, step: str, action) -> bool:
+    """Apply `action` (which triggers one rerun) and record its latency; False if the app raised"""
+    queued = time.perf_counter()
+    with _RERUN_LOCK:
+        started = time.perf_counter()
+        action()
+        finished = time.perf_counter()
+    report.record(step, finished - queued, finished - started)
+    if at.exception:
+        report.errors.append(f"{step}: {at.exception[0].message}")
+        return False
+    return True
+
+def _click(at: AppTest, report: SessionReport, step: str, key: Optional[str] = None,
+           label: Optional[str] = None) -> bool:
+    """Click the button with `key` (or containing `label`) and rerun; False if it is missing or the app raised"""
+    for button in at.button:
+        if (key is not None and button.key == key) or (label is not None and label in str(button.label)):
+            return _step(at, report, step, button.click().run)
+    report.errors.append(f"{step}: button {key or label!r} not rendered")
+    return False
+
+def run_session(session: int, flows: int) -> SessionReport:
+    """One simulated user running `flows` search flows in its own AppTest session"""
+    report = SessionReport(session)
+    rng = np.random.default_rng(session)
+    at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT_SECONDS)
+    if not _step(at, report, "open", at.run):
+        return report
+
+    for _ in range(flows):
+        route = f"route_{int(rng.integers(POPULAR_ROUTE_BUTTONS))}"
+        if not (_click(at, report, "popular_route", key=route) and _click(at, report, "search", label="Search Flights")):
+            break
+
+        if not any(box.key == "results_sort" for box in at.selectbox):
+            report.errors.append("search: no results rendered")
+            break
+        sort_by = str(rng.choice(["price", "departure", "duration", "value"]))
+        _step(at, report, "sort", at.selectbox(key="results_sort").set_value(sort_by).run)
+        next_page = next((b for b in at.button if b.key == "results_next"), None)
+        if next_page is not None and not next_page.disabled:
+            _click(at, report, "next_page", key="results_next")
+
+        lock = next((b.key for b in at.button if b.key and b.key.startswith("lock_")), None)
+        if lock is not None:
+            _click(at, report, "lock_price", key=lock)
+
+        if not (_click(at, report, "swap", label="Swap") and _click(at, report, "search", label="Search Flights")):
+            break
+    return report
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000
+    return {
+        'count': len(values),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max()),
+    }
+
+def run_process(sessions: List[int], flows: int, concurrency: int) -> Dict:
+    """Run `sessions` as threads in this process, sharing its caches; top-level so workers can run it.
+
+    Returns plain dicts: AppTest swaps `__main__` while it runs the app, so
+    classes defined in this script can't be unpickled by the parent.
+    """
+    # Import the app's dependencies and warm the module caches before measuring memory
+    with _RERUN_LOCK:
+        AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT_SECONDS).run()
+    rss_before = current_rss_bytes()
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(sessions))),
+                            thread_name_prefix="load-session") as pool:
+        reports = list(pool.map(lambda session: run_session(session, flows), sessions))
+    return {'sessions': [asdict(report) for report in reports], 'rss_before_bytes': rss_before,
+            'rss_after_bytes': current_rss_bytes()}
+
+def _merge(reports: List[SessionReport], attribute: str) -> Dict[str, List[float]]:
+    steps = {}
+    for report in reports:
+        for step, samples in getattr(report, attribute).items():
+            steps.setdefault(step, []).extend(samples)
+    return steps
+
+def run_load_test(sessions: int, flows: int, concurrency: int, processes: int = 1) -> Dict:
+    """Spread `sessions` round-robin over `processes` (each running up to `concurrency` at once)"""
+    shares = [list(range(sessions))[index::processes] for index in range(processes)]
+    started = time.perf_counter()
+    if processes == 1:
+        process_reports = [run_process(shares[0], flows, concurrency)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            process_reports = list(pool.map(run_process, shares, [flows] * processes, [concurrency] * processes))
+    elapsed = time.perf_counter() - started
+
+    reports = [SessionReport(**report) for process in process_reports for report in process['sessions']]
+    latencies, service = _merge(reports, 'latencies'), _merge(reports, 'service')
+    all_latencies = [sample for samples in latencies.values() for sample in samples]
+    all_service = [sample for samples in service.values() for sample in samples]
+    waits = [total - own for total, own in zip(all_latencies, all_service)]
+    rss_before = sum(process['rss_before_bytes'] for process in process_reports)
+    rss_after = sum(process['rss_after_bytes'] for process in process_reports)
+    return {
+        'sessions': sessions,
+        'flows_per_session': flows,
+        'concurrency': concurrency,
+        'processes': processes,
+        'elapsed_seconds': elapsed,
+        'reruns': len(all_latencies),
+        'reruns_per_second': len(all_latencies) / elapsed,
+        # Reruns one process can serve per second if it did nothing else
+        'capacity_reruns_per_second_per_process': len(all_service) / sum(all_service),
+        'overall': percentiles(all_latencies),
+        'overall_service': percentiles(all_service),
+        'queue_wait': percentiles(waits),
+        'steps': {step: percentiles(samples) for step, samples in latencies.items()},
+        'steps_service': {step: percentiles(samples) for step, samples in service.items()},
+        'rss_before_bytes': rss_before,
+        'rss_after_bytes': rss_after,
+        'rss_growth_per_session_bytes': (rss_after - rss_before) / sessions,
+        'errors': [f"session {report.session}: {error}" for report in reports for error in report.errors],
+    }
+
+def _print_table(title: str, rows: List) -> None:
+    print(f"{title:<16}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for step, stats in rows:
+        print(f"{step:<16}{stats['count']:>7}{stats['p50_ms']:>8.0f}ms{stats['p95_ms']:>8.0f}ms"
+              f"{stats['p99_ms']:>8.0f}ms{stats['max_ms']:>8.0f}ms")
+    print()
+
+def print_summary(summary: Dict) -> None:
+    print(f"{summary['sessions']} sessions x {summary['flows_per_session']} flows over {summary['processes']} "
+          f"process(es), up to {summary['concurrency']} concurrent per process: {summary['reruns']} reruns in "
+          f"{summary['elapsed_seconds']:.1f}s ({summary['reruns_per_second']:.1f} reruns/s)\n")
+    _print_table("service time", list(summary['steps_service'].items()) + [('overall', summary['overall_service'])])
+    _print_table("end to end", list(summary['steps'].items()) + [('overall', summary['overall']),
+                                                                  ('queue wait', summary['queue_wait'])])
+    print(f"One process serves about {summary['capacity_reruns_per_second_per_process']:.1f} reruns/s; "
+          f"beyond that, reruns queue and end-to-end latency grows with the number of active users.")
+    print(f"\nRSS {summary['rss_before_bytes'] / 2**20:.0f} MB -> {summary['rss_after_bytes'] / 2**20:.0f} MB, "
+          f"{summary['rss_growth_per_session_bytes'] / 2**20:.2f} MB per session")
+    for error in summary['errors']:
+        print(f"ERROR {error}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8, help="simulated users")
+    parser.add_argument("--flows", type=int, default=2, help="search flows per user")
+    parser.add_argument("--concurrency", type=int, help="users running at once per process (default: all)")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to spread users over")
+    parser.add_argument("--max-p95-ms", type=float, help="exit 1 if overall p95 rerun service time exceeds this")
+    parser.add_argument("--json", dest="json_path", help="write the summary to this file")
+    args = parser.parse_args(argv)
+
+    summary = run_load_test(args.sessions, args.flows, args.concurrency or args.sessions, max(1, args.processes))
+    print_summary(summary)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    if summary['errors']:
+        return 1
+    if args.max_p95_ms is not None and summary['overall_service']['p95_ms'] > args.max_p95_ms:
+        print(f"\np95 service time {summary['overall_service']['p95_ms']:.0f}ms exceeds {args.max_p95_ms:.0f}ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""Headless benchmarks for the CheepNow search pipeline.
+
+Runs each pipeline stage outside of a Streamlit server over a grid of result
+sizes and route counts, reports throughput and peak traced memory, and exits
+non-zero when a stage is slower or heavier than `thresholds.json` allows.
+
+    python benchmarks/run_benchmarks.py              # full grid, 10 to 100k flights
+    python benchmarks/run_benchmarks.py --quick      # skip the 100k-flight cases
+    python benchmarks/run_benchmarks.py --json out.json
+
+Cold import times of the engine, the chart module and the app are measured
+first, each in a fresh interpreter; `cheepnow.core` must not load Streamlit
+or Plotly. Then `batch_search` is checked to return the same fares as
+`search_flights` for the same search keys, whatever its chunk size.
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import date
+from itertools import permutations
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import cheepnow.core as core  # noqa: E402
+from cheepnow import charts  # noqa: E402
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+FLIGHT_SIZES = [10, 1_000, 10_000, 100_000]
+ROUTE_PAIRS = list(permutations(core.AIRPORT_CODES, 2))
+ROUTE_COUNTS = [1, 8, len(ROUTE_PAIRS)]
+BENCH_DATE = "2026-11-15"
+BENCH_TODAY = date(2026, 10, 16)  # day the benchmark fares are observed on
+
+@dataclass
+class Stage:
+    name: str
+    setup: Callable  # batch -> argument for `run`
+    run: Callable
+    max_flights: Optional[int] = None  # skip larger cases for stages that are quadratic or chart-bound
+    ops: Optional[Callable] = None  # batch -> operations per run, defaults to one per flight
+
+@dataclass
+class Result:
+    stage: str
+    flights: int
+    routes: int
+    seconds: float
+    ops_per_second: float
+    us_per_op: float
+    peak_bytes: int
+    failures: List[str]
+
+def make_batch(n_flights: int, n_routes: int, seed: int = 0) -> core.FlightBatch:
+    """Ranked batch of exactly `n_flights` flights spread across the first `n_routes` routes"""
+    routes = ROUTE_PAIRS[:n_routes]
+    rng = np.random.default_rng(seed)
+    jobs = []
+    batch = None
+    # Flights per job vary with distance, so grow the job list until there are enough rows
+    while batch is None or len(batch) < n_flights:
+        missing = n_flights if batch is None else n_flights - len(batch)
+        start = len(jobs)
+        jobs.extend(routes[(start + i) % n_routes] + (BENCH_DATE,) for i in range(max(1, math.ceil(missing / 5))))
+        batch = core.generate_flight_batch(jobs, rng)
+    return core.rank_batch(batch.take(np.arange(n_flights)))
+
+def _jobs_for(batch: core.FlightBatch) -> List[Tuple[str, str, str]]:
+    return list(batch.jobs)
+
+def _score_single(flights: List[core.Flight]) -> None:
+    for flight in flights:
+        core.calculate_value_score(flight, flights)
+
+def _lock_cycle(batch: core.FlightBatch) -> None:
+    store = core.PriceLockStore(core.MemoryBackend(), now=0.0)
+    for flight in batch:
+        store.acquire(core.fare_key(flight), "bench", flight, now=0.0)
+    for flight in batch:
+        store.get(core.fare_key(flight), now=1.0)
+    store.purge(now=core.PRICE_LOCK_MINUTES * 60 + 1.0)
+
+def _observe_history(batch: core.FlightBatch) -> None:
+    core.PriceHistoryStore().observe_batch(batch, BENCH_TODAY)
+
+def _register_alerts(batch: core.FlightBatch) -> Tuple[core.PriceAlertEngine, core.FlightBatch]:
+    """Engine with a date alert per job and a flight alert per flight, thresholds spread around the fares"""
+    engine = core.PriceAlertEngine()
+    rng = np.random.default_rng(2)
+    low, high = float(batch.total_price.min()), float(batch.total_price.max())
+    for origin, destination, departure_date in batch.jobs:
+        engine.add("bench", origin, destination, rng.uniform(low, high), departure_date=departure_date, now=0.0)
+    for flight in batch:
+        engine.add("bench", flight.departure_airport.code, flight.arrival_airport.code, rng.uniform(low, high),
+                   departure_date=flight.departure_date, flight_number=flight.flight_number, now=0.0)
+    return engine, batch
+
+def _build_figures(frame) -> None:
+    for builder in charts.FIGURE_BUILDERS.values():
+        builder(frame).to_json()
+
+STAGES = [
+    Stage('generate', _jobs_for, lambda jobs: core.generate_flight_batch(jobs, np.random.default_rng(1))),
+    Stage('score', lambda batch: batch, core.score_flight_batch),
+    Stage('score_single', lambda batch: batch.to_flights(), _score_single, max_flights=1_000),
+    Stage('recommendations', lambda batch: batch, lambda batch: core.assign_recommendation_reasons(batch, np.random.default_rng(1))),
+    Stage('to_flights', lambda batch: batch, lambda batch: batch.to_flights(), max_flights=10_000),
+    Stage('frame', lambda batch: batch, core.build_flights_frame),
+    Stage('indexes', lambda batch: batch,
+          lambda batch: core.build_sort_orders(batch).departure_index),
+    Stage('fingerprint', lambda batch: batch, core.batch_fingerprint),
+    Stage('summary', lambda batch: batch, core.summarize_results),
+    # observe_batch rewrites the trend and history columns, so each run gets its own copy
+    Stage('history', lambda batch: batch.take(np.arange(len(batch))), _observe_history),
+    Stage('alerts', _register_alerts, lambda args: args[0].evaluate(args[1])),
+    Stage('figures', core.build_flights_frame, _build_figures, max_flights=10_000),
+    Stage('locks', lambda batch: batch, _lock_cycle, max_flights=10_000, ops=lambda batch: 2 * len(batch)),
+]
+
+def measure(stage: Stage, batch: core.FlightBatch, repeat: int) -> Tuple[float, int]:
+    """Best-of-`repeat` wall time, then peak traced memory from one extra run"""
+    best = math.inf
+    for _ in range(repeat):
+        argument = stage.setup(batch)
+        start = time.perf_counter()
+        stage.run(argument)
+        best = min(best, time.perf_counter() - start)
+
+    argument = stage.setup(batch)
+    tracemalloc.start()
+    try:
+        stage.run(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+# Cold import in a fresh interpreter; prints the import time and any UI libraries it pulled in
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+ui = [name for name in ('streamlit', 'plotly', 'plotly.express') if name in sys.modules]
+print("IMPORT", elapsed, ','.join(ui) or '-')
+"""
+
+def measure_imports(limits: Dict, repeat: int) -> List[str]:
+    """Median cold import time per module; returns threshold violations"""
+    failures = []
+    print(f"{'module':<18}{'import':>11}  UI libraries loaded")
+    for module, module_limits in limits.items():
+        samples, ui = [], "-"
+        for _ in range(repeat):
+            completed = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module)], cwd=APP_DIR,
+                                       capture_output=True, text=True, check=True)
+            line = next(line for line in completed.stdout.splitlines() if line.startswith("IMPORT "))
+            _, elapsed, ui = line.split()
+            samples.append(float(elapsed))
+        seconds = statistics.median(samples)
+        problems = []
+        if 'max_seconds' in module_limits and seconds > module_limits['max_seconds']:
+            problems.append(f"{seconds:.2f}s > {module_limits['max_seconds']}")
+        forbidden = set(ui.split(',')) & set(module_limits.get('forbid', []))
+        if forbidden:
+            problems.append(f"imports {', '.join(sorted(forbidden))}")
+        flag = "  REGRESSION: " + "; ".join(problems) if problems else ""
+        print(f"{module:<18}{seconds * 1000:>9.0f}ms  {ui}{flag}")
+        failures.extend(f"{module}: {problem}" for problem in problems)
+    print()
+    return failures
+
+BULK_CHECK_JOBS = 12
+BULK_CHECK_NOW = 1_790_000_000.0
+
+def check_bulk_consistency() -> List[str]:
+    """`batch_search` must return, for every job and chunk size, the fares `search_flights` gives for its key"""
+    failures = []
+    jobs = [route + (day,) for route in core.POPULAR_ROUTES[:3]
+            for day in ("2026-11-14", "2026-11-15", "2026-11-16", "2026-12-20")][:BULK_CHECK_JOBS]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        expected = [core.search_flights(*job, executor, core.SearchCache(), now=BULK_CHECK_NOW)[0].flights
+                    for job in jobs]
+    for chunk_size in (1, 5, None):
+        batches = core.batch_search(jobs, summarize=False, max_workers=1, chunk_size=chunk_size,
+                                    now=BULK_CHECK_NOW)
+        for job, batch, reference in zip(jobs, batches, expected):
+            same = (len(batch) == len(reference)
+                    and [flight.flight_number for flight in batch] == [flight.flight_number for flight in reference]
+                    and all(np.array_equal(getattr(batch, name), getattr(reference, name))
+                            for name in ('total_price', 'departure_minutes', 'value_score', 'reason')))
+            if not same:
+                failures.append(f"batch_search chunk_size={chunk_size} differs from search_flights for {job}")
+    print(f"bulk consistency: {len(jobs)} jobs x 3 chunk sizes, {'OK' if not failures else 'MISMATCH'}\n")
+    return failures
+
+def check(result: Result, limits: Dict, min_flights: int) -> List[str]:
+    """Threshold violations for one result; tiny cases are dominated by fixed overhead and only reported"""
+    if result.flights < min_flights:
+        return []
+    failures = []
+    if 'max_us_per_op' in limits and result.us_per_op > limits['max_us_per_op']:
+        failures.append(f"{result.us_per_op:.2f} µs/op > {limits['max_us_per_op']}")
+    if 'max_peak_bytes_per_flight' in limits and result.peak_bytes / result.flights > limits['max_peak_bytes_per_flight']:
+        failures.append(f"{result.peak_bytes / result.flights:.0f} B/flight peak > {limits['max_peak_bytes_per_flight']}")
+    return failures
+
+def run(sizes: List[int], route_counts: List[int], stages: List[Stage], repeat: int, thresholds: Dict) -> List[Result]:
+    results = []
+    stage_limits = thresholds.get('stages', {})
+    min_flights = thresholds.get('min_flights', 0)
+    print(f"{'stage':<16}{'flights':>9}{'routes':>8}{'time':>11}{'ops/s':>14}{'µs/op':>10}{'peak':>11}")
+    for n_routes in route_counts:
+        for n_flights in sizes:
+            batch = make_batch(n_flights, n_routes)
+            for stage in stages:
+                if stage.max_flights is not None and n_flights > stage.max_flights:
+                    continue
+                seconds, peak = measure(stage, batch, repeat)
+                ops = stage.ops(batch) if stage.ops is not None else n_flights
+                result = Result(stage.name, n_flights, n_routes, seconds, ops / seconds,
+                                seconds / ops * 1e6, peak, [])
+                result.failures = check(result, stage_limits.get(stage.name, {}), min_flights)
+                results.append(result)
+                flag = "  REGRESSION: " + "; ".join(result.failures) if result.failures else ""
+                print(f"{stage.name:<16}{n_flights:>9,}{n_routes:>8}{seconds * 1000:>9.2f}ms"
+                      f"{result.ops_per_second:>14,.0f}{result.us_per_op:>10.2f}{peak / 1024:>9,.0f}KB{flag}")
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-flight cases")
+    parser.add_argument("--sizes", type=int, nargs="+", help="result sizes in flights")
+    parser.add_argument("--routes", type=int, nargs="+", help="route counts, up to all airport pairs")
+    parser.add_argument("--stages", nargs="+", choices=[stage.name for stage in STAGES])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the best is kept")
+    parser.add_argument("--skip-imports", action="store_true", help="don't measure cold import times")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    parser.add_argument("--json", dest="json_path", help="write all results to this file")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or [size for size in FLIGHT_SIZES if not (args.quick and size > 10_000)]
+    route_counts = [min(count, len(ROUTE_PAIRS)) for count in (args.routes or ROUTE_COUNTS)]
+    stages = [stage for stage in STAGES if not args.stages or stage.name in args.stages]
+    with open(args.thresholds, encoding="utf-8") as f:
+        thresholds = json.load(f)
+
+    import_failures = [] if args.skip_imports else measure_imports(thresholds.get('imports', {}), args.repeat)
+    import_failures += check_bulk_consistency()
+    results = run(sizes, route_counts, stages, args.repeat, thresholds)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+    regressions = [result for result in results if result.failures]
+    for failure in import_failures:
+        print(f"FAILED {failure}")
+    if regressions or import_failures:
+        print(f"\n{len(regressions) + len(import_failures)} case(s) exceeded {args.thresholds}")
+        return 1
+    print(f"\nAll {len(results)} cases within thresholds")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
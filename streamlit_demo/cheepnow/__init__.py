@@ -0,0 +1 @@
+"""CheepNow flight search: `cheepnow.core` holds the engine, `cheepnow.charts` the Plotly figures"""
@@ -0,0 +1,245 @@
+"""JSON search API over the CheepNow engine, for services that can't drive the Streamlit UI.
+
+Needs Starlette and uvicorn (both in requirements.txt); from `streamlit_demo/` run:
+
+    uvicorn cheepnow.api:app --port 8000
+
+    GET  /api/flights/search?origin=MNL&destination=CEB&date=2026-11-15&passengers=1&sort=value&limit=20
+    POST /api/flights/search          the same fields as a JSON body, or the web app's SearchCriteria
+    GET  /api/flights/search/stream   NDJSON: one search line, then one `Flight` per line
+    GET  /api/health
+
+Flights use the `Flight` dataclass schema. Responses are gzipped when the
+client accepts it, carry an ETag derived from the result fingerprint and
+answer a matching If-None-Match with 304 Not Modified; `X-Cache: HIT` or
+`MISS` says whether the search was served from the shared cache. Results for a search
+key are fixed for the rest of the seeding epoch, which `Cache-Control`
+advertises. Searches share one process-wide cache and stage pool across all
+requests, and uvicorn keeps connections alive, so clients should reuse one
+connection (e.g. a `requests.Session`) rather than reconnecting per search.
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Optional
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from .core.alerts import PriceAlertEngine
+from .core.cache import SearchCache
+from .core.history import PriceHistoryStore
+from .core.metrics import perf_timer
+from .core.models import AIRPORTS
+from .core.results import RESULT_SORTS
+from .core.rng import SEED_EPOCH_SECONDS
+from .core.search import SearchResult, search_flights
+
+MAX_PASSENGERS = 21  # 9 adults, 8 children and 4 infants, as in the search form
+GZIP_MINIMUM_BYTES = 1024
+GZIP_LEVEL = 6  # level 9 costs about twice the CPU for a few percent smaller JSON
+STREAM_CHUNK_FLIGHTS = 64  # flights serialized per NDJSON chunk
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+@dataclass(frozen=True)
+class SearchQuery:
+    origin: str
+    destination: str
+    departure_date: str
+    passengers: int = 1
+    sort: str = 'value'
+    offset: int = 0
+    limit: Optional[int] = None  # None returns every flight from `offset`
+
+def _int_field(params: Dict, name: str, default, minimum: int, maximum: Optional[int] = None):
+    value = params.get(name)
+    if value is None or value == "":
+        return default
+    # JSON booleans and floats would silently truncate, so only ints and digit strings (query params) pass
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if value < minimum or (maximum is not None and value > maximum):
+        bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        raise ValueError(f"{name} must be {bounds}")
+    return value
+
+def parse_search_query(params: Dict) -> SearchQuery:
+    """Validate search parameters from a query string or JSON body; raises ValueError.
+
+    Accepts `date` or `departure_date`, and the web app's SearchCriteria
+    shape (`departureDate`, `passengers: {adults, children, infants}`).
+    """
+    origin = str(params.get('origin', '')).upper()
+    destination = str(params.get('destination', '')).upper()
+    for name, code in (('origin', origin), ('destination', destination)):
+        if code not in AIRPORTS:
+            raise ValueError(f"{name} must be one of {', '.join(AIRPORTS)}")
+    if origin == destination:
+        raise ValueError("origin and destination must differ")
+
+    departure_date = str(params.get('date') or params.get('departure_date') or params.get('departureDate') or '')
+    try:
+        departure_date = datetime.strptime(departure_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD") from None
+
+    passengers = params.get('passengers')
+    if isinstance(passengers, dict):
+        passengers = sum(_int_field(passengers, name, 0, 0) for name in ('adults', 'children', 'infants'))
+    passengers = _int_field({'passengers': passengers}, 'passengers', 1, 1, MAX_PASSENGERS)
+
+    sort = str(params.get('sort') or 'value')
+    if sort not in RESULT_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(RESULT_SORTS)}")
+    return SearchQuery(origin, destination, departure_date, passengers, sort,
+                       offset=_int_field(params, 'offset', 0, 0), limit=_int_field(params, 'limit', None, 1))
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def page_rows(result: SearchResult, query: SearchQuery) -> np.ndarray:
+    """Batch rows for the requested sort and page"""
+    order = result.sort_orders[query.sort]
+    stop = None if query.limit is None else query.offset + query.limit
+    return order[query.offset:stop]
+
+def search_metadata(result: SearchResult, query: SearchQuery, rows: np.ndarray, expires_at: float) -> Dict:
+    return {
+        'search': {
+            'origin': query.origin,
+            'destination': query.destination,
+            'departure_date': query.departure_date,
+            'passengers': query.passengers,
+            'sort': query.sort,
+            'offset': query.offset,
+            'limit': query.limit,
+        },
+        'fingerprint': result.fingerprint,
+        'total': len(result.flights),
+        'count': len(rows),
+        'expires_at': datetime.fromtimestamp(expires_at, timezone.utc).isoformat(),
+        'anti_manipulation': result.manipulation_data,
+    }
+
+def response_etag(result: SearchResult, query: SearchQuery, media_type: str, expires_at: float) -> str:
+    """Strong ETag for one representation: everything the body is built from"""
+    representation = (f"{result.fingerprint}|{query.passengers}|{query.sort}|{query.offset}|{query.limit}"
+                      f"|{media_type}|{expires_at}")
+    return '"' + hashlib.blake2b(representation.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (candidate[2:] if candidate.startswith("W/") else candidate
+                                         for candidate in candidates)
+
+def render_json(result: SearchResult, rows: np.ndarray, metadata: Dict) -> bytes:
+    with perf_timer('api.render_json'):
+        return _dumps(dict(metadata, flights=result.flights.take(rows).to_records()))
+
+def render_ndjson_chunk(result: SearchResult, rows: np.ndarray) -> bytes:
+    with perf_timer('api.render_ndjson_chunk'):
+        return b"".join(_dumps(record) + b"\n" for record in result.flights.take(rows).to_records())
+
+async def _ndjson_lines(result: SearchResult, rows: np.ndarray, metadata: Dict) -> AsyncIterator[bytes]:
+    """Search line first, then flights in chunks serialized off the event loop as the client reads"""
+    yield _dumps(metadata) + b"\n"
+    for start in range(0, len(rows), STREAM_CHUNK_FLIGHTS):
+        yield await run_in_threadpool(render_ndjson_chunk, result, rows[start:start + STREAM_CHUNK_FLIGHTS])
+
+async def _read_query(request: Request) -> SearchQuery:
+    if request.method == "POST":
+        try:
+            params = await request.json()
+        except ValueError:
+            raise ValueError("body must be JSON") from None
+        if not isinstance(params, dict):
+            raise ValueError("body must be a JSON object")
+        return parse_search_query(params)
+    return parse_search_query(dict(request.query_params))
+
+async def _search(request: Request, media_type: str) -> Response:
+    try:
+        query = await _read_query(request)
+    except ValueError as error:
+        return JSONResponse({'error': str(error)}, status_code=400)
+
+    now = time.time()
+    state = request.app.state
+    with perf_timer('api.search'):
+        result, cached = await run_in_threadpool(search_flights, query.origin, query.destination, query.departure_date,
+                                                 state.executor, state.cache, now=now,
+                                                 history=state.history, alerts=state.alerts)
+    expires_at = (now // SEED_EPOCH_SECONDS + 1) * SEED_EPOCH_SECONDS
+    etag = response_etag(result, query, media_type, expires_at)
+    # Whether this process had the result cached isn't part of the representation, so it goes in a header
+    headers = {'ETag': etag, 'Cache-Control': f"public, max-age={int(expires_at - now)}",
+               'X-Cache': "HIT" if cached else "MISS"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    rows = page_rows(result, query)
+    metadata = search_metadata(result, query, rows, expires_at)
+    if media_type == NDJSON_MEDIA_TYPE:
+        return StreamingResponse(_ndjson_lines(result, rows, metadata), media_type=media_type, headers=headers)
+    body = await run_in_threadpool(render_json, result, rows, metadata)
+    return Response(body, media_type=media_type, headers=headers)
+
+async def search_endpoint(request: Request) -> Response:
+    return await _search(request, "application/json")
+
+async def stream_endpoint(request: Request) -> Response:
+    return await _search(request, NDJSON_MEDIA_TYPE)
+
+async def health_endpoint(request: Request) -> Response:
+    cache = request.app.state.cache
+    return JSONResponse({'status': 'ok', 'cache': {'hits': cache.hits, 'misses': cache.misses}})
+
+def create_app(executor: Optional[Executor] = None, cache: Optional[SearchCache] = None,
+               history: Optional[PriceHistoryStore] = None, alerts: Optional[PriceAlertEngine] = None) -> Starlette:
+    """API application; pass an executor, cache, history store and alert engine to share them, otherwise it owns its own.
+
+    Fresh API results are checked against `alerts`, so an engine shared with
+    the web app fires its travelers' alerts on API searches too.
+    """
+    owns_executor = executor is None
+    executor = executor if executor is not None else ThreadPoolExecutor(max_workers=4, thread_name_prefix="cheepnow-api")
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        yield
+        if owns_executor:
+            executor.shutdown(wait=False)
+
+    app = Starlette(
+        routes=[
+            Route("/api/flights/search", search_endpoint, methods=["GET", "POST"]),
+            Route("/api/flights/search/stream", stream_endpoint, methods=["GET", "POST"]),
+            Route("/api/health", health_endpoint),
+        ],
+        middleware=[Middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_BYTES, compresslevel=GZIP_LEVEL)],
+        lifespan=lifespan,
+    )
+    app.state.executor = executor
+    app.state.cache = cache if cache is not None else SearchCache()
+    app.state.history = history if history is not None else PriceHistoryStore()
+    app.state.alerts = alerts if alerts is not None else PriceAlertEngine()
+    return app
+
+app = create_app()
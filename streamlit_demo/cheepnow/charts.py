@@ -0,0 +1,134 @@
+"""Plotly chart figures for the price analysis tabs, cached per result set.
+
+Imported lazily by the UI so Plotly only loads once results are rendered.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from .core.frames import build_airline_stats
+from .core.metrics import perf_timer
+from .core.models import MINUTES_PER_DAY, format_clock_minutes
+
+def build_price_figure(frame: pd.DataFrame) -> go.Figure:
+    fig = px.scatter(
+        frame, 
+        x='Airline', 
+        y='Price',
+        color='Value Score',
+        size='Customer Rating',
+        hover_data=['Flight', 'Carry-on', 'On-time Performance'],
+        title="Flight Prices with Value Scoring",
+        color_continuous_scale='RdYlGn'
+    )
+    fig.update_layout(height=500)
+    return fig
+
+def build_timeline_figure(frame: pd.DataFrame) -> go.Figure:
+    fig = px.scatter(
+        frame,
+        x='Departure Hour',
+        y='Price', 
+        color='Airline',
+        size=np.full(len(frame), 100),
+        hover_data=['Time', 'Duration', 'Aircraft'],
+        title="Flight Prices by Departure Time"
+    )
+    hours = list(range(0, 25, 3))
+    fig.update_xaxes(range=[0, 24], tickmode='array', tickvals=hours,
+                     ticktext=[format_clock_minutes(hour * 60 % MINUTES_PER_DAY) for hour in hours])
+    return fig
+
+def build_eco_figure(frame: pd.DataFrame) -> go.Figure:
+    return px.bar(
+        frame,
+        x='Airline',
+        y='CO₂ Emissions (kg)',
+        color='Efficiency Score',
+        title="Environmental Impact by Airline",
+        color_continuous_scale='RdYlGn'
+    )
+
+def build_airline_radar_figure(frame: pd.DataFrame) -> go.Figure:
+    airline_stats = build_airline_stats(frame)
+    categories = ['Price Score', 'On-time Performance', 'Customer Rating', 'Value Features']
+    
+    fig_radar = go.Figure()
+    for airline, stats in airline_stats.iterrows():
+        fig_radar.add_trace(go.Scatterpolar(
+            r=stats[categories].tolist(),
+            theta=categories,
+            fill='toself',
+            name=airline
+        ))
+    
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )),
+        showlegend=True,
+        title="Airline Performance Comparison"
+    )
+    return fig_radar
+
+FIGURE_BUILDERS = {
+    'price': build_price_figure,
+    'timeline': build_timeline_figure,
+    'eco': build_eco_figure,
+    'airline_radar': build_airline_radar_figure,
+}
+
+FIGURE_CACHE_MAX_ENTRIES = 256
+
+class FigureCache:
+    """LRU cache of serialized Plotly figures keyed by (result fingerprint, chart type).
+
+    Reruns for the same result set rehydrate the stored figure JSON instead of
+    rebuilding the figure from the DataFrame. Build, serialization and load
+    times are recorded per chart type as `chart.<type>.<step>` perf stages.
+    """
+    
+    def __init__(self, max_entries: int = FIGURE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (fingerprint, chart) -> figure JSON
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_figure(self, fingerprint: str, chart: str, frame: pd.DataFrame) -> go.Figure:
+        key = (fingerprint, chart)
+        with self._lock:
+            figure_json = self._entries.get(key)
+            if figure_json is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        
+        if figure_json is not None:
+            with perf_timer(f"chart.{chart}.load"):
+                return pio.from_json(figure_json, skip_invalid=True)
+        
+        with perf_timer(f"chart.{chart}.build"):
+            fig = FIGURE_BUILDERS[chart](frame)
+        with perf_timer(f"chart.{chart}.serialize"):
+            figure_json = fig.to_json()
+        
+        with self._lock:
+            self._entries[key] = figure_json
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fig
+    
+    def stats(self) -> Dict:
+        """Entry count and hit/miss counters"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
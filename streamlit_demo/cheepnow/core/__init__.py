@@ -0,0 +1,51 @@
+"""CheepNow search engine, importable without Streamlit or Plotly.
+
+Data models and route data, columnar flight generation and scoring, the
+search pipeline and caches, multi-route batch search, result filtering,
+price history, price locks and alerts, and storage.
+"""
+from .alerts import AlertMatch, PriceAlert, PriceAlertEngine
+from .batch import RECOMMENDATION_REASONS, FlightBatch, FlightView, batch_fingerprint
+from .bulk import (
+    FARE_REPORT_DAYS, JobSummary, batch_search, fare_report_jobs, search_job, search_job_chunk, summarize_batch,
+)
+from .cache import SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_TTL_SECONDS, SearchCache
+from .frames import build_airline_stats, build_flights_frame
+from .generation import (
+    calculate_carbon_footprint, generate_enhanced_mock_flights, generate_flight_batch, generate_price_trend,
+    rank_batch, simulate_anti_manipulation,
+)
+from .history import (
+    DEMAND_SEAT_THRESHOLDS, PRICE_HISTORY_CAPACITY_DAYS, PRICE_TREND_THRESHOLD, PriceHistoryStore, demand_levels,
+    trend_codes,
+)
+from .locks import PriceLockStore, fare_key, get_lock_time_remaining
+from .metrics import LATENCY_BUCKETS, PERF_ENV, PERF_RECORDER, LatencyHistogram, PerfRecorder, perf_timer
+from .models import (
+    AIRCRAFT_EMISSION_MULTIPLIERS, AIRCRAFT_TYPES, AIRLINE_CODES, AIRLINE_TYPE_MULTIPLIERS, AIRLINES, AIRPORTS,
+    DEMAND_LEVELS, MINUTES_PER_DAY, PEAK_SEASON_MONTHS, POPULAR_ROUTES, PRICE_HISTORY_DAYS, PRICE_LOCK_MINUTES,
+    PRICE_TREND_WEIGHTS, PRICE_TRENDS, SCHEDULE_SCORES_BY_HOUR, Airline, Airport, Flight, PriceHistory, PriceLock,
+    arrival_clock_minutes, format_clock_minutes,
+)
+from .results import (
+    CARRY_ON_INCLUDED, DEPARTURE_TIME_WINDOWS, ECO_KG_PER_VALUE_POINT, RESULT_PAGE_SIZES, RESULT_SORTS,
+    SORT_ORDER_KEYS, SUMMARY_LEADERS, SUMMARY_TOP_K, DepartureIndex, ResultSummary, SortOrders, apply_preferences,
+    build_departure_index, build_sort_orders, paginate, preference_mask, sort_flight_indices, summarize_results,
+    top_k_rows,
+)
+from .rng import SEED_EPOCH_SECONDS, SearchStreams, epoch_bucket, session_rng, spawn_streams, stable_seed
+from .routes import (
+    AIRPORT_CODES, AIRPORT_INDEX, ROUTE_DISTANCE_MATRIX, ROUTE_DURATION_MATRIX, ROUTE_FARE_MATRIX, ROUTE_TABLE,
+    RouteInfo, get_route, great_circle_km,
+)
+from .scoring import (
+    AIRLINE_VALUE_SCORES, assign_recommendation_reasons, calculate_airline_value_score, calculate_value_score,
+    score_flight_batch,
+)
+from .search import (
+    CACHED_SEARCH_MESSAGE, FLEXIBLE_DATE_DAYS, ROUND_TRIP_RANKINGS, ROUND_TRIP_TOP_K, SEARCH_STAGES,
+    FareMatrixCell, RoundTripOption, SearchResult, build_fare_matrix, flexible_search_dates, rank_round_trips,
+    run_search_pipeline, search_cache_key, search_flexible_dates, search_flights, search_round_trip, search_seed,
+    top_k_pair_sums,
+)
+from .storage import STORAGE_PATH_ENV, MemoryBackend, SQLiteBackend, create_storage_backend
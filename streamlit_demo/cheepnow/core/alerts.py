@@ -0,0 +1,199 @@
+"""Price alerts, evaluated in one batched pass against each fresh result set"""
+import bisect
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .batch import FlightBatch, FlightView
+from .models import AIRLINE_CODES
+from .storage import MemoryBackend
+
+AlertKey = Tuple[str, str, Optional[str], Optional[str]]  # (origin, destination, departure date, flight number)
+
+@dataclass(frozen=True)
+class PriceAlert:
+    alert_id: str  # unique across processes sharing a storage backend
+    owner: str  # traveler id of whoever set it
+    origin: str
+    destination: str
+    threshold: float  # fires once a matching fare is cheaper than this
+    departure_date: Optional[str] = None  # None: any date
+    flight_number: Optional[str] = None  # None: any flight on the route
+    created_at: float = 0.0  # epoch seconds
+
+    @property
+    def key(self) -> AlertKey:
+        return (self.origin, self.destination, self.departure_date, self.flight_number)
+
+@dataclass(frozen=True)
+class AlertMatch:
+    alert: PriceAlert
+    flight: FlightView
+    price: float
+
+class _AlertBucket:
+    """Alerts sharing one key, kept sorted by threshold.
+
+    The alerts undercut by a price are exactly those with a higher threshold,
+    i.e. a suffix of the sorted list: one binary search finds them and
+    truncating the list retires them. Buckets are small, so plain lists with
+    `bisect` beat NumPy's per-call overhead.
+    """
+    __slots__ = ('alerts', 'thresholds', 'pending')
+
+    def __init__(self):
+        self.alerts = []  # sorted by threshold
+        self.thresholds = []
+        self.pending = []  # added since the last sort
+
+    def __len__(self) -> int:
+        return len(self.alerts) + len(self.pending)
+
+    def _sort(self) -> None:
+        if self.pending:
+            self.alerts = sorted(self.alerts + self.pending, key=lambda alert: alert.threshold)
+            self.thresholds = [alert.threshold for alert in self.alerts]
+            self.pending = []
+
+    def fire_below(self, price: float) -> List[PriceAlert]:
+        """Remove and return every alert whose threshold is above `price`"""
+        self._sort()
+        start = bisect.bisect_right(self.thresholds, price)
+        fired = self.alerts[start:]
+        if fired:
+            self.alerts = self.alerts[:start]
+            self.thresholds = self.thresholds[:start]
+        return fired
+
+    def remove(self, alert_id: str) -> None:
+        self._sort()
+        keep = [i for i, alert in enumerate(self.alerts) if alert.alert_id != alert_id]
+        self.alerts = [self.alerts[i] for i in keep]
+        self.thresholds = [self.thresholds[i] for i in keep]
+
+class PriceAlertEngine:
+    """Price alerts shared by every session, indexed by route, date and flight.
+
+    `evaluate` checks a result set against every registered alert in one pass:
+    route-wide alerts only need each job's cheapest fare, and flight alerts are
+    only looked up on routes that have any. Each lookup is a binary search in
+    a threshold-sorted bucket, so the cost grows with the fares searched and
+    the alerts fired, not with the number of alerts registered. Fired alerts
+    are retired and queued for their owner until `take_notifications`.
+
+    Alerts are written through to `backend` when added and deleted from it
+    when cancelled or fired, and the engine starts from the alerts the
+    backend holds.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self._buckets = {}  # AlertKey -> _AlertBucket
+        self._alerts = {}  # alert id -> PriceAlert
+        self._by_owner = {}  # owner -> {alert id: PriceAlert}
+        self._flight_alert_routes = {}  # (origin, destination) -> number of flight-specific alerts
+        self._inbox = {}  # owner -> [AlertMatch]
+        self._lock = threading.Lock()
+        for record in self.backend.load_price_alerts():
+            self._insert(PriceAlert(**record))
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def add(self, owner: str, origin: str, destination: str, threshold: float,
+            departure_date: Optional[str] = None, flight_number: Optional[str] = None,
+            now: Optional[float] = None) -> PriceAlert:
+        """Register an alert for fares on a route (optionally one date or flight) cheaper than `threshold`"""
+        alert = PriceAlert(uuid.uuid4().hex, owner, origin, destination, float(threshold), departure_date,
+                           flight_number, time.time() if now is None else now)
+        with self._lock:
+            self._insert(alert)
+        self.backend.save_price_alert(asdict(alert))
+        return alert
+
+    def _insert(self, alert: PriceAlert) -> None:
+        self._buckets.setdefault(alert.key, _AlertBucket()).pending.append(alert)
+        self._alerts[alert.alert_id] = alert
+        self._by_owner.setdefault(alert.owner, {})[alert.alert_id] = alert
+        if alert.flight_number is not None:
+            route = (alert.origin, alert.destination)
+            self._flight_alert_routes[route] = self._flight_alert_routes.get(route, 0) + 1
+
+    def remove(self, alert_id: str) -> bool:
+        with self._lock:
+            alert = self._alerts.get(alert_id)
+            if alert is None:
+                return False
+            self._buckets[alert.key].remove(alert_id)
+            self._forget(alert)
+        self.backend.delete_price_alerts([alert_id])
+        return True
+
+    def _forget(self, alert: PriceAlert) -> None:
+        del self._alerts[alert.alert_id]
+        owned = self._by_owner[alert.owner]
+        del owned[alert.alert_id]
+        if not owned:
+            del self._by_owner[alert.owner]
+        bucket = self._buckets.get(alert.key)
+        if bucket is not None and not len(bucket):
+            del self._buckets[alert.key]
+        if alert.flight_number is not None:
+            route = (alert.origin, alert.destination)
+            self._flight_alert_routes[route] -= 1
+            if not self._flight_alert_routes[route]:
+                del self._flight_alert_routes[route]
+
+    def alerts_for(self, owner: str) -> List[PriceAlert]:
+        """Active alerts set by `owner`, oldest first"""
+        with self._lock:
+            return list(self._by_owner.get(owner, {}).values())
+
+    def _fire(self, key: AlertKey, batch: FlightBatch, row: int, price: float, matches: List[AlertMatch]) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        for alert in bucket.fire_below(price):
+            matches.append(AlertMatch(alert, FlightView(batch, row), price))
+
+    def evaluate(self, batch: FlightBatch) -> List[AlertMatch]:
+        """Fire every alert undercut by a fare in `batch`, returning the matches and queueing them for their owners"""
+        if not len(batch) or not self._alerts:
+            return []
+        # Group rows by job once; each group's cheapest row settles every route-wide alert for that job
+        order = np.lexsort((batch.total_price, batch.job))
+        counts = np.bincount(batch.job, minlength=len(batch.jobs))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        prices = batch.total_price.tolist()
+
+        matches = []
+        with self._lock:
+            for job, (origin, destination, departure_date) in enumerate(batch.jobs):
+                if not counts[job]:
+                    continue
+                rows = order[starts[job]:starts[job] + counts[job]]
+                cheapest = int(rows[0])
+                self._fire((origin, destination, None, None), batch, cheapest, prices[cheapest], matches)
+                self._fire((origin, destination, departure_date, None), batch, cheapest, prices[cheapest], matches)
+                if (origin, destination) not in self._flight_alert_routes:
+                    continue
+                for row in rows.tolist():
+                    flight_number = f"{AIRLINE_CODES[batch.airline[row]]} {batch.flight_slot[row]}{batch.number_suffix[row]}"
+                    self._fire((origin, destination, None, flight_number), batch, row, prices[row], matches)
+                    self._fire((origin, destination, departure_date, flight_number), batch, row, prices[row], matches)
+
+            for match in matches:
+                self._forget(match.alert)
+                self._inbox.setdefault(match.alert.owner, []).append(match)
+        if matches:
+            self.backend.delete_price_alerts([match.alert.alert_id for match in matches])
+        return matches
+
+    def take_notifications(self, owner: str) -> List[AlertMatch]:
+        """Matches fired for `owner` since the last call"""
+        with self._lock:
+            return self._inbox.pop(owner, [])
@@ -0,0 +1,312 @@
+"""Columnar flight result sets and their row views"""
+import hashlib
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .models import (
+    AIRCRAFT_TYPES, AIRLINE_CODES, AIRLINES, AIRPORTS, DEMAND_LEVELS, PRICE_TRENDS,
+    Airline, Airport, Flight, PriceHistory, arrival_clock_minutes, format_clock_minutes,
+)
+
+RECOMMENDATION_REASONS = (
+    "excellent punctuality",
+    "all baggage included",
+    "eco-friendly choice",
+    "high customer satisfaction",
+    "price trending down",
+    "competitive pricing"  # fallback when no other reason applies
+)
+
+@dataclass
+class FlightBatch:
+    """Columnar flight result set for one or more (origin, destination, date) jobs.
+
+    Every per-flight attribute is a fixed-width NumPy array with one row per
+    flight; airlines, airports (via `jobs`), aircraft, trends, demand levels and
+    recommendation reasons are interned as small indices into lookup tables.
+    Iterating or indexing yields lightweight `FlightView` rows, and `Flight`
+    dataclasses are only built by `to_flights`.
+    """
+    jobs: List[Tuple[str, str, str]]
+    job: np.ndarray
+    airline: np.ndarray
+    flight_slot: np.ndarray
+    id_suffix: np.ndarray
+    number_suffix: np.ndarray
+    departure_minutes: np.ndarray  # minutes since midnight
+    duration_minutes: np.ndarray
+    aircraft: np.ndarray
+    base_price: np.ndarray
+    taxes: np.ndarray
+    total_price: np.ndarray
+    seats_available: np.ndarray
+    price_trend: np.ndarray
+    carbon_emissions: np.ndarray
+    history_price: np.ndarray  # shape (n, len(history_dates)), NaN on days without an observed price
+    history_demand: np.ndarray  # shape (n, len(history_dates))
+    history_dates: List[str]  # newest first; empty until a PriceHistoryStore has observed the batch
+    value_score: np.ndarray
+    reason: np.ndarray
+
+    COLUMN_DTYPES = {
+        'job': np.int32,
+        'airline': np.uint8,
+        'flight_slot': np.uint8,
+        'id_suffix': np.uint16,
+        'number_suffix': np.uint8,
+        'departure_minutes': np.uint16,
+        'duration_minutes': np.uint16,
+        'aircraft': np.uint8,
+        'base_price': np.float32,
+        'taxes': np.float32,
+        'total_price': np.float32,
+        'seats_available': np.uint8,
+        'price_trend': np.uint8,
+        'carbon_emissions': np.float32,
+        'history_price': np.float32,
+        'history_demand': np.uint8,
+        'value_score': np.float32,
+        'reason': np.uint8,
+    }
+
+    def __post_init__(self):
+        for name, dtype in self.COLUMN_DTYPES.items():
+            setattr(self, name, np.asarray(getattr(self, name), dtype=dtype))
+
+    def __len__(self) -> int:
+        return len(self.job)
+
+    def __getitem__(self, row: int) -> 'FlightView':
+        if not -len(self) <= row < len(self):
+            raise IndexError("flight row out of range")
+        return FlightView(self, row % len(self))
+
+    def __iter__(self):
+        return (FlightView(self, row) for row in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the numeric columns"""
+        return sum(getattr(self, name).nbytes for name in self.COLUMN_DTYPES)
+
+    def take(self, indices) -> 'FlightBatch':
+        """Return a new batch containing only the given rows, in that order"""
+        columns = {}
+        for name, value in vars(self).items():
+            columns[name] = value[indices] if isinstance(value, np.ndarray) else value
+        return FlightBatch(**columns)
+
+    def split(self) -> List['FlightBatch']:
+        """Split a multi-job batch into one batch per job, keeping each job's row order"""
+        order = np.argsort(self.job, kind="stable")
+        bounds = np.cumsum(np.bincount(self.job, minlength=len(self.jobs)))[:-1]
+        return [self.take(rows) for rows in np.split(order, bounds)]
+
+    def to_flights(self) -> List[Flight]:
+        """Materialize the rows as `Flight` dataclasses"""
+        flights = []
+        history_prices = self.history_price.tolist()
+        history_demands = self.history_demand.tolist()
+        arrival_minutes = arrival_clock_minutes(self.departure_minutes, self.duration_minutes)
+        rows = zip(
+            self.job.tolist(), self.airline.tolist(), self.flight_slot.tolist(),
+            self.id_suffix.tolist(), self.number_suffix.tolist(),
+            self.departure_minutes.tolist(), arrival_minutes.tolist(),
+            self.duration_minutes.tolist(), self.aircraft.tolist(),
+            self.base_price.tolist(), self.taxes.tolist(), self.total_price.tolist(),
+            self.seats_available.tolist(), self.price_trend.tolist(),
+            self.carbon_emissions.tolist(), self.value_score.tolist(), self.reason.tolist()
+        )
+        for i, (job, airline, slot, id_suffix, number_suffix, departure, arrival, duration, aircraft, base_price, taxes, total_price,
+                seats, trend, emissions, value_score, reason) in enumerate(rows):
+            origin, destination, _ = self.jobs[job]
+            airline_code = AIRLINE_CODES[airline]
+            price_history = [
+                PriceHistory(date, price, DEMAND_LEVELS[demand])
+                for date, price, demand in zip(self.history_dates, history_prices[i], history_demands[i])
+                if price == price  # NaN: no price observed that day
+            ]
+            flights.append(Flight(
+                id=f"{airline_code}{slot}{id_suffix}",
+                flight_number=f"{airline_code} {slot}{number_suffix}",
+                airline=AIRLINES[airline_code],
+                departure_airport=AIRPORTS[origin],
+                arrival_airport=AIRPORTS[destination],
+                departure_time=format_clock_minutes(departure),
+                arrival_time=format_clock_minutes(arrival),
+                duration_minutes=duration,
+                base_price=base_price,
+                taxes=taxes,
+                total_price=total_price,
+                seats_available=seats,
+                aircraft=AIRCRAFT_TYPES[aircraft],
+                price_trend=PRICE_TRENDS[trend],
+                carbon_emissions=emissions,
+                price_history=price_history,
+                value_score=value_score,
+                recommendation_reason=f"Recommended for {RECOMMENDATION_REASONS[reason]}"
+            ))
+        return flights
+
+    def to_records(self) -> List[Dict]:
+        """Rows as JSON-ready dicts in the `Flight` schema, with prices rounded to centavos.
+
+        Built column-wise without materializing `Flight` objects; rows share
+        one dict per airline and airport.
+        """
+        airlines = [asdict(AIRLINES[code]) for code in AIRLINE_CODES]
+        airports = {code: asdict(airport) for code, airport in AIRPORTS.items()}
+        history_prices = np.round(self.history_price.astype(np.float64), 2).tolist()
+        history_demands = self.history_demand.tolist()
+        arrival_minutes = arrival_clock_minutes(self.departure_minutes, self.duration_minutes)
+        rows = zip(
+            self.job.tolist(), self.airline.tolist(), self.flight_slot.tolist(),
+            self.id_suffix.tolist(), self.number_suffix.tolist(),
+            self.departure_minutes.tolist(), arrival_minutes.tolist(), self.duration_minutes.tolist(),
+            self.aircraft.tolist(),
+            *(np.round(getattr(self, name).astype(np.float64), 2).tolist()
+              for name in ('base_price', 'taxes', 'total_price', 'carbon_emissions', 'value_score')),
+            self.seats_available.tolist(), self.price_trend.tolist(), self.reason.tolist()
+        )
+        records = []
+        for i, (job, airline, slot, id_suffix, number_suffix, departure, arrival, duration, aircraft, base_price, taxes,
+                total_price, emissions, value_score, seats, trend, reason) in enumerate(rows):
+            origin, destination, _ = self.jobs[job]
+            airline_code = AIRLINE_CODES[airline]
+            records.append({
+                'id': f"{airline_code}{slot}{id_suffix}",
+                'flight_number': f"{airline_code} {slot}{number_suffix}",
+                'airline': airlines[airline],
+                'departure_airport': airports[origin],
+                'arrival_airport': airports[destination],
+                'departure_time': format_clock_minutes(departure),
+                'arrival_time': format_clock_minutes(arrival),
+                'duration_minutes': duration,
+                'base_price': base_price,
+                'taxes': taxes,
+                'total_price': total_price,
+                'seats_available': seats,
+                'aircraft': AIRCRAFT_TYPES[aircraft],
+                'price_locked_until': None,
+                'price_trend': PRICE_TRENDS[trend],
+                'carbon_emissions': emissions,
+                'price_history': [
+                    {'date': date, 'price': price, 'demand_level': DEMAND_LEVELS[demand]}
+                    for date, price, demand in zip(self.history_dates, history_prices[i], history_demands[i])
+                    if price == price
+                ],
+                'value_score': value_score,
+                'recommendation_reason': f"Recommended for {RECOMMENDATION_REASONS[reason]}"
+            })
+        return records
+
+class FlightView:
+    """Read-only, `Flight`-like view of one FlightBatch row, used for rendering"""
+    __slots__ = ('batch', 'row')
+
+    def __init__(self, batch: FlightBatch, row: int):
+        self.batch = batch
+        self.row = row
+
+    def __repr__(self) -> str:
+        return f"FlightView({self.flight_number!r}, {self.departure_airport.code}->{self.arrival_airport.code}, ₱{self.total_price:,.0f})"
+
+    @property
+    def id(self) -> str:
+        b, r = self.batch, self.row
+        return f"{AIRLINE_CODES[b.airline[r]]}{b.flight_slot[r]}{b.id_suffix[r]}"
+
+    @property
+    def flight_number(self) -> str:
+        b, r = self.batch, self.row
+        return f"{AIRLINE_CODES[b.airline[r]]} {b.flight_slot[r]}{b.number_suffix[r]}"
+
+    @property
+    def airline(self) -> Airline:
+        return AIRLINES[AIRLINE_CODES[self.batch.airline[self.row]]]
+
+    @property
+    def departure_airport(self) -> Airport:
+        return AIRPORTS[self.batch.jobs[self.batch.job[self.row]][0]]
+
+    @property
+    def arrival_airport(self) -> Airport:
+        return AIRPORTS[self.batch.jobs[self.batch.job[self.row]][1]]
+
+    @property
+    def departure_date(self) -> str:
+        return self.batch.jobs[self.batch.job[self.row]][2]
+
+    @property
+    def departure_minutes(self) -> int:
+        return int(self.batch.departure_minutes[self.row])
+
+    @property
+    def departure_time(self) -> str:
+        return format_clock_minutes(self.departure_minutes)
+
+    @property
+    def arrival_time(self) -> str:
+        return format_clock_minutes(arrival_clock_minutes(self.departure_minutes, self.duration_minutes))
+
+    @property
+    def duration_minutes(self) -> int:
+        return int(self.batch.duration_minutes[self.row])
+
+    @property
+    def base_price(self) -> float:
+        return float(self.batch.base_price[self.row])
+
+    @property
+    def taxes(self) -> float:
+        return float(self.batch.taxes[self.row])
+
+    @property
+    def total_price(self) -> float:
+        return float(self.batch.total_price[self.row])
+
+    @property
+    def seats_available(self) -> int:
+        return int(self.batch.seats_available[self.row])
+
+    @property
+    def aircraft(self) -> str:
+        return AIRCRAFT_TYPES[self.batch.aircraft[self.row]]
+
+    @property
+    def price_locked_until(self) -> Optional[str]:
+        return None
+
+    @property
+    def price_trend(self) -> str:
+        return PRICE_TRENDS[self.batch.price_trend[self.row]]
+
+    @property
+    def carbon_emissions(self) -> float:
+        return float(self.batch.carbon_emissions[self.row])
+
+    @property
+    def price_history(self) -> List[PriceHistory]:
+        b, r = self.batch, self.row
+        return [
+            PriceHistory(date, float(price), DEMAND_LEVELS[demand])
+            for date, price, demand in zip(b.history_dates, b.history_price[r], b.history_demand[r])
+            if not np.isnan(price)
+        ]
+
+    @property
+    def value_score(self) -> float:
+        return float(self.batch.value_score[self.row])
+
+    @property
+    def recommendation_reason(self) -> str:
+        return f"Recommended for {RECOMMENDATION_REASONS[self.batch.reason[self.row]]}"
+
+def batch_fingerprint(batch: FlightBatch) -> str:
+    """Content hash identifying a result set, used as a cache key for derived artifacts"""
+    digest = hashlib.blake2b(repr((batch.jobs, batch.history_dates)).encode("utf-8"), digest_size=16)
+    for name in FlightBatch.COLUMN_DTYPES:
+        digest.update(np.ascontiguousarray(getattr(batch, name)).tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,121 @@
+"""Multi-route batch search, sharded across worker processes"""
+import math
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .batch import FlightBatch
+from .generation import generate_flight_batch, rank_batch
+from .models import POPULAR_ROUTES
+from .rng import epoch_bucket, spawn_streams
+from .scoring import assign_recommendation_reasons
+from .search import search_cache_key, search_seed
+
+BULK_CHUNKS_PER_WORKER = 4  # several chunks per worker so a slow chunk doesn't idle the rest
+BULK_MIN_CHUNK_JOBS = 16  # below this, per-chunk pickling outweighs the searches
+FARE_REPORT_DAYS = 90
+
+Job = Tuple[str, str, str]  # (origin, destination, departure date)
+
+@dataclass
+class JobSummary:
+    origin: str
+    destination: str
+    departure_date: str
+    flights_found: int
+    cheapest_price: float
+    cheapest_flight: str
+    best_value_score: float
+    best_value_flight: str
+    average_price: float
+
+def fare_report_jobs(days: int = FARE_REPORT_DAYS, start: Optional[str] = None,
+                     routes: Sequence[Tuple[str, str]] = POPULAR_ROUTES) -> List[Job]:
+    """Every route for each of the `days` days from `start` (default today)"""
+    first = date.fromisoformat(start) if start else date.today()
+    dates = [(first + timedelta(days=offset)).isoformat() for offset in range(days)]
+    return [(origin, destination, day) for origin, destination in routes for day in dates]
+
+def summarize_batch(batch: FlightBatch) -> List[JobSummary]:
+    """Cheapest flight, best value and average price for every job of a batch, without a per-job loop over rows"""
+    n_jobs = len(batch.jobs)
+    counts = np.bincount(batch.job, minlength=n_jobs)
+    price_sums = np.bincount(batch.job, weights=batch.total_price, minlength=n_jobs)
+    # Group rows by job, best row first within each group; a group's first row is its winner
+    group_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    cheapest = np.lexsort((batch.total_price, batch.job))[group_starts[counts > 0]]
+    best_value = np.lexsort((-batch.value_score, batch.job))[group_starts[counts > 0]]
+
+    summaries = []
+    found = iter(zip(cheapest.tolist(), best_value.tolist()))
+    for job, (origin, destination, departure_date) in enumerate(batch.jobs):
+        if counts[job] == 0:
+            summaries.append(JobSummary(origin, destination, departure_date, 0, 0.0, "", 0.0, "", 0.0))
+            continue
+        cheapest_row, best_row = next(found)
+        summaries.append(JobSummary(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            flights_found=int(counts[job]),
+            cheapest_price=round(float(batch.total_price[cheapest_row]), 2),
+            cheapest_flight=batch[cheapest_row].flight_number,
+            best_value_score=round(float(batch.value_score[best_row]), 2),
+            best_value_flight=batch[best_row].flight_number,
+            average_price=round(float(price_sums[job] / counts[job]), 2)
+        ))
+    return summaries
+
+def search_job(job: Job, seed: int) -> FlightBatch:
+    """Ranked flights for one job from its own streams, exactly as `search_flights` generates them"""
+    streams = spawn_streams(seed)
+    batch = rank_batch(generate_flight_batch([job], streams.generation))
+    assign_recommendation_reasons(batch, streams.recommendations)
+    return batch
+
+def search_job_chunk(jobs: List[Job], seeds: List[int], summarize: bool) -> Union[List[JobSummary], List[FlightBatch]]:
+    """Search a chunk of jobs, each from its own seed. Runs in a worker process, so it must stay top-level."""
+    batches = [search_job(job, seed) for job, seed in zip(jobs, seeds)]
+    if summarize:
+        return [summary for batch in batches for summary in summarize_batch(batch)]
+    return batches
+
+def chunk_jobs(jobs: List[Job], chunk_size: int) -> List[List[Job]]:
+    return [jobs[start:start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+
+def batch_search(jobs: List[Job], summarize: bool = True, max_workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None, executor: Optional[Executor] = None,
+                 now: Optional[float] = None) -> Union[List[JobSummary], List[FlightBatch]]:
+    """Search many (origin, destination, date) jobs, returning one summary or ranked batch per job, in order.
+
+    Jobs are cut into chunks sized for `max_workers` workers (default: CPU
+    count), and chunks are spread over `executor` or a process pool of that
+    size; with one worker or one chunk and no executor they run in this
+    process. Callers passing an executor should pass its worker count too. Each job is seeded from its own search key
+    (route, date and the epoch bucket of `now`), so its fares are
+    the ones `search_flights` returns for that key in the same epoch, whatever
+    the chunk size and whichever process runs it.
+    """
+    if not jobs:
+        return []
+    workers = max_workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(BULK_MIN_CHUNK_JOBS, math.ceil(len(jobs) / (workers * BULK_CHUNKS_PER_WORKER)))
+    chunks = chunk_jobs(list(jobs), chunk_size)
+    epoch = epoch_bucket(now if now is not None else time.time())
+    seeds = [[search_seed(search_cache_key(*job, epoch)) for job in chunk] for chunk in chunks]
+    flags = [summarize] * len(chunks)
+
+    if executor is None and (workers == 1 or len(chunks) == 1):
+        results = map(search_job_chunk, chunks, seeds, flags)
+    elif executor is not None:
+        results = executor.map(search_job_chunk, chunks, seeds, flags)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(search_job_chunk, chunks, seeds, flags))
+    return [item for chunk_result in results for item in chunk_result]
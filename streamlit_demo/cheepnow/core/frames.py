@@ -0,0 +1,60 @@
+"""Per-flight and per-airline DataFrames for the price analysis tabs"""
+import numpy as np
+import pandas as pd
+
+from .batch import FlightBatch
+from .models import AIRCRAFT_TYPES, AIRLINE_CODES, AIRLINES, PRICE_TRENDS
+
+def _airline_column(batch: FlightBatch, attribute: str) -> np.ndarray:
+    """Per-row airline attribute looked up through the interned airline index"""
+    return np.array([getattr(AIRLINES[code], attribute) for code in AIRLINE_CODES])[batch.airline]
+
+def _format_clock(minutes: np.ndarray) -> pd.Series:
+    return pd.Series(minutes // 60).astype(str).str.zfill(2) + ":" + pd.Series(minutes % 60).astype(str).str.zfill(2)
+
+def build_flights_frame(batch: FlightBatch) -> pd.DataFrame:
+    """Canonical per-flight DataFrame shared by every price analysis tab.
+
+    Built once per search straight from the batch columns, without creating
+    a Python object per flight.
+    """
+    airline_codes = np.array(AIRLINE_CODES)[batch.airline]
+    carry_on = _airline_column(batch, 'carry_on_included')
+    emissions = batch.carbon_emissions.astype(float)
+    max_emissions = emissions.max() if len(emissions) else 1.0
+    
+    return pd.DataFrame({
+        'Flight': pd.Series(airline_codes) + " " + pd.Series(batch.flight_slot).astype(str) + pd.Series(batch.number_suffix).astype(str),
+        'Airline': _airline_column(batch, 'name'),
+        'Type': np.char.title(_airline_column(batch, 'type')),
+        'Price': batch.total_price.astype(float),
+        'Carry-on': np.where(carry_on, '✅ Included', '❌ Extra fee'),
+        'Carry-on Included': carry_on,
+        'Checked Bag Included': _airline_column(batch, 'checked_baggage_included'),
+        'On-time Performance': _airline_column(batch, 'on_time_performance') * 100,
+        'Customer Rating': _airline_column(batch, 'customer_rating'),
+        'Value Score': batch.value_score.astype(float),
+        'Price Trend': np.array(PRICE_TRENDS)[batch.price_trend],
+        'Time': _format_clock(batch.departure_minutes),
+        'Departure Hour': batch.departure_minutes / 60,
+        'Duration': pd.Series(batch.duration_minutes // 60).astype(str) + "h " + pd.Series(batch.duration_minutes % 60).astype(str) + "m",
+        'Aircraft': np.array(AIRCRAFT_TYPES)[batch.aircraft],
+        'CO₂ Emissions (kg)': emissions,
+        'Efficiency Score': 100 - emissions / max_emissions * 100
+    })
+
+def build_airline_stats(frame: pd.DataFrame) -> pd.DataFrame:
+    """Per-airline averages and radar chart scores derived from the flights frame"""
+    stats = frame.groupby('Airline', sort=False).agg(
+        avg_price=('Price', 'mean'),
+        on_time_perf=('On-time Performance', 'first'),
+        rating=('Customer Rating', 'first'),
+        carry_on=('Carry-on Included', 'first'),
+        checked_bag=('Checked Bag Included', 'first')
+    )
+    max_price = stats['avg_price'].max()
+    stats['Price Score'] = (max_price - stats['avg_price']) / max_price * 100
+    stats['On-time Performance'] = stats['on_time_perf']
+    stats['Customer Rating'] = stats['rating'] * 20
+    stats['Value Features'] = stats['carry_on'] * 50 + stats['checked_bag'] * 50
+    return stats
@@ -0,0 +1,145 @@
+"""Vectorized mock flight generation"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .batch import RECOMMENDATION_REASONS, FlightBatch
+from .models import (
+    AIRCRAFT_EMISSION_MULTIPLIERS, AIRCRAFT_TYPES, AIRLINE_CODES, AIRLINE_TYPE_MULTIPLIERS, AIRLINES,
+    PEAK_SEASON_MONTHS, PRICE_TREND_WEIGHTS, PRICE_TRENDS, Flight,
+)
+from .rng import stable_seed
+from .routes import (
+    AIRPORT_CODES, AIRPORT_INDEX, MIN_FLIGHT_MINUTES, ROUTE_DISTANCE_MATRIX, ROUTE_DURATION_MATRIX, ROUTE_FARE_MATRIX,
+)
+from .scoring import assign_recommendation_reasons, score_flight_batch
+
+# Scheduled flight numbers: a route's n-th daily flight on an airline keeps its number across searches,
+# so its fares can be tracked over time
+MAX_DAILY_FLIGHTS = 3
+FLIGHT_NUMBER_SUFFIXES = np.random.default_rng(stable_seed("flight-numbers")).integers(
+    10, 100, (len(AIRPORT_CODES), len(AIRPORT_CODES), len(AIRLINE_CODES), MAX_DAILY_FLIGHTS)
+)
+
+# Advanced utility functions
+def calculate_carbon_footprint(distance_km: float, aircraft: str) -> float:
+    """Calculate CO2 emissions for flight"""
+    base_emission = distance_km * 0.15  # kg CO2 per km
+    return base_emission * AIRCRAFT_EMISSION_MULTIPLIERS.get(aircraft, 1.0)
+
+def generate_price_trend(rng: Optional[np.random.Generator] = None) -> str:
+    """Generate realistic price trend"""
+    rng = rng if rng is not None else np.random.default_rng()
+    return PRICE_TRENDS[rng.choice(len(PRICE_TRENDS), p=PRICE_TREND_WEIGHTS)]
+
+def simulate_anti_manipulation(rng: Optional[np.random.Generator] = None) -> Dict:
+    """Simulate anti-price manipulation detection"""
+    rng = rng if rng is not None else np.random.default_rng()
+    techniques = [
+        "Cookie bypass active",
+        "User agent rotation",
+        "IP geolocation masking",
+        "Search pattern randomization",
+        "Cache avoidance enabled"
+    ]
+    
+    return {
+        'techniques_used': [techniques[i] for i in rng.choice(len(techniques), 3, replace=False)],
+        'manipulation_attempts_blocked': int(rng.integers(2, 9)),
+        'clean_pricing_confidence': float(rng.uniform(0.92, 0.99)),
+        'price_inflation_prevented': float(rng.uniform(200, 800))
+    }
+
+def generate_flight_batch(jobs: List[Tuple[str, str, str]], rng: Optional[np.random.Generator] = None) -> FlightBatch:
+    """Generate flights for many (origin, destination, date) jobs in one vectorized pass"""
+    rng = rng if rng is not None else np.random.default_rng()
+    n_jobs = len(jobs)
+    n_airlines = len(AIRLINE_CODES)
+    
+    # Per-job route and season data
+    origin_index = np.array([AIRPORT_INDEX[o] for o, _, _ in jobs], dtype=np.int64)
+    destination_index = np.array([AIRPORT_INDEX[d] for _, d, _ in jobs], dtype=np.int64)
+    distance = ROUTE_DISTANCE_MATRIX[origin_index, destination_index]
+    route_price = ROUTE_FARE_MATRIX[origin_index, destination_index]
+    route_duration = ROUTE_DURATION_MATRIX[origin_index, destination_index]
+    seasonal = np.array([
+        1.3 if datetime.strptime(date, "%Y-%m-%d").month in PEAK_SEASON_MONTHS else 1.0
+        for _, _, date in jobs
+    ])
+    
+    # Per-airline data
+    airline_types = [AIRLINES[code].type for code in AIRLINE_CODES]
+    is_regional = np.array([t == "regional" for t in airline_types])
+    multiplier_low = np.array([AIRLINE_TYPE_MULTIPLIERS[t][0] for t in airline_types])
+    multiplier_high = np.array([AIRLINE_TYPE_MULTIPLIERS[t][1] for t in airline_types])
+    
+    # 1-3 flights per airline (1-2 for regional), regional airlines on short routes only
+    max_flights = np.where(is_regional, 2, MAX_DAILY_FLIGHTS)
+    counts = rng.integers(1, max_flights + 1, size=(n_jobs, n_airlines))
+    counts[(distance[:, None] > 600) & is_regional[None, :]] = 0
+    counts = counts.ravel()
+    n = int(counts.sum())
+    
+    job = np.repeat(np.repeat(np.arange(n_jobs), n_airlines), counts)
+    airline = np.repeat(np.tile(np.arange(n_airlines), n_jobs), counts)
+    group_start = np.repeat(np.cumsum(counts) - counts, counts)
+    flight_slot = np.arange(n) - group_start + 1
+    
+    # Advanced pricing: airline, demand and time-of-day multipliers
+    price_multiplier = rng.uniform(multiplier_low[airline], multiplier_high[airline])
+    demand_multiplier = rng.uniform(0.9, 1.6, n)
+    departure_hour = rng.integers(5, 24, n)
+    time_multiplier = np.where((departure_hour < 8) | (departure_hour > 20), 0.9, 1.0)
+    
+    base_price = route_price[job] * seasonal[job] * price_multiplier * demand_multiplier * time_multiplier
+    taxes = base_price * 0.12  # 12% VAT
+    total_price = base_price + taxes
+    
+    # Realistic flight schedule
+    flight_distance = distance[job]
+    departure_minutes = departure_hour * 60 + rng.integers(0, 4, n) * 15
+    duration = np.maximum(MIN_FLIGHT_MINUTES, route_duration[job] + rng.integers(-20, 31, n))
+    
+    # Aircraft selection based on route distance, then carbon emissions
+    aircraft_pick = rng.integers(0, 2, n)
+    long_haul_options = np.array([AIRCRAFT_TYPES.index("Airbus A320"), AIRCRAFT_TYPES.index("Boeing 737")])
+    short_haul_options = np.array([AIRCRAFT_TYPES.index("ATR 72"), AIRCRAFT_TYPES.index("Airbus A320")])
+    aircraft = np.where(flight_distance > 400, long_haul_options[aircraft_pick], short_haul_options[aircraft_pick])
+    emission_multipliers = np.array([AIRCRAFT_EMISSION_MULTIPLIERS[a] for a in AIRCRAFT_TYPES])
+    carbon_emissions = flight_distance * 0.15 * emission_multipliers[aircraft]
+    
+    return FlightBatch(
+        jobs=list(jobs),
+        job=job,
+        airline=airline,
+        flight_slot=flight_slot,
+        id_suffix=rng.integers(100, 1000, n),
+        number_suffix=FLIGHT_NUMBER_SUFFIXES[origin_index[job], destination_index[job], airline, flight_slot - 1],
+        departure_minutes=departure_minutes,
+        duration_minutes=duration,
+        aircraft=aircraft,
+        base_price=base_price,
+        taxes=taxes,
+        total_price=total_price,
+        seats_available=rng.integers(3, 46, n),
+        price_trend=np.full(n, PRICE_TRENDS.index("stable")),
+        carbon_emissions=carbon_emissions,
+        # Trends and history come from a PriceHistoryStore once the fares are observed
+        history_price=np.empty((n, 0)),
+        history_demand=np.empty((n, 0)),
+        history_dates=[],
+        value_score=np.zeros(n),
+        reason=np.full(n, len(RECOMMENDATION_REASONS) - 1)
+    )
+
+def generate_enhanced_mock_flights(origin: str, destination: str, departure_date: str, passengers: int) -> List[Flight]:
+    """Generate highly realistic mock flight data with advanced features"""
+    batch = rank_batch(generate_flight_batch([(origin, destination, departure_date)]))
+    assign_recommendation_reasons(batch)
+    return batch.to_flights()
+
+def rank_batch(batch: FlightBatch) -> FlightBatch:
+    """Score a batch and reorder it by value score (best first)"""
+    batch.value_score = score_flight_batch(batch)
+    return batch.take(np.argsort(-batch.value_score, kind="stable"))
@@ -0,0 +1,171 @@
+"""Per-fare price history in calendar-indexed NumPy ring buffers"""
+import threading
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .batch import FlightBatch
+from .models import AIRLINE_CODES, DEMAND_LEVELS, PRICE_HISTORY_DAYS, PRICE_TRENDS
+
+PRICE_HISTORY_CAPACITY_DAYS = 30
+PRICE_TREND_THRESHOLD = 0.03  # a fare 3% off its rolling average is rising or falling
+DEMAND_SEAT_THRESHOLDS = (15, 30)  # fewer seats left than these: High, then Medium demand
+
+SeriesKey = Tuple[str, str, str, str]  # (flight number, origin, destination, departure date)
+
+def demand_levels(seats_available: np.ndarray) -> np.ndarray:
+    """DEMAND_LEVELS index per fare, from how few seats are left"""
+    high, medium = DEMAND_SEAT_THRESHOLDS
+    return np.where(seats_available < high, DEMAND_LEVELS.index("High"),
+                    np.where(seats_available < medium, DEMAND_LEVELS.index("Medium"), DEMAND_LEVELS.index("Low")))
+
+def trend_codes(prices: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """PRICE_TRENDS index per fare from its change against `reference` (NaN: no history, stable)"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change = prices / reference - 1
+    return np.where(change > PRICE_TREND_THRESHOLD, PRICE_TRENDS.index("rising"),
+                    np.where(change < -PRICE_TREND_THRESHOLD, PRICE_TRENDS.index("falling"),
+                             PRICE_TRENDS.index("stable")))
+
+class PriceHistoryStore:
+    """Daily price series per (flight number, route, departure date), shared by every search.
+
+    Each series owns one row of fixed-size arrays addressed by calendar day:
+    day `d` lives in column `d % capacity_days`, written twice (at `c` and
+    `c + capacity_days`) so that any window of up to `capacity_days` days
+    ending today is one contiguous slice, with no wrap-around copy. A day
+    keeps the last price observed on it; slots whose stored day doesn't
+    match are older data and read as missing.
+    """
+
+    def __init__(self, capacity_days: int = PRICE_HISTORY_CAPACITY_DAYS, initial_series: int = 64):
+        self.capacity_days = capacity_days
+        self._rows = {}  # SeriesKey -> row
+        self._prices = np.full((initial_series, 2 * capacity_days), np.nan, dtype=np.float32)
+        self._days = np.full((initial_series, 2 * capacity_days), -1, dtype=np.int32)  # date ordinal per slot
+        self._demand = np.zeros((initial_series, 2 * capacity_days), dtype=np.uint8)
+        self._departures = np.zeros(initial_series, dtype=np.int32)  # departure date ordinal per row
+        self._lock = threading.Lock()
+        self._last_purge = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        return self._prices.nbytes + self._days.nbytes + self._demand.nbytes + self._departures.nbytes
+
+    def _row_indices(self, keys: List[SeriesKey]) -> np.ndarray:
+        """Rows for `keys`, allocating (and growing the arrays) for new series"""
+        rows = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = len(self._rows)
+                if row == len(self._departures):
+                    self._grow(max(2 * row, 16))
+                self._departures[row] = date.fromisoformat(key[3]).toordinal()
+            rows[i] = row
+        return rows
+
+    def _grow(self, size: int) -> None:
+        extra = size - len(self._departures)
+        width = 2 * self.capacity_days
+        self._prices = np.vstack([self._prices, np.full((extra, width), np.nan, dtype=np.float32)])
+        self._days = np.vstack([self._days, np.full((extra, width), -1, dtype=np.int32)])
+        self._demand = np.vstack([self._demand, np.zeros((extra, width), dtype=np.uint8)])
+        self._departures = np.concatenate([self._departures, np.zeros(extra, dtype=np.int32)])
+
+    def _window(self, rows, today: int, days: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(prices, demand) for the `days` days ending `today`, oldest first; missing days are NaN"""
+        if not 0 < days <= self.capacity_days:
+            raise ValueError(f"window must be 1 to {self.capacity_days} days")
+        stop = today % self.capacity_days + self.capacity_days + 1
+        columns = slice(stop - days, stop)
+        current = self._days[rows, columns] == np.arange(today - days + 1, today + 1, dtype=np.int32)
+        return np.where(current, self._prices[rows, columns], np.nan), self._demand[rows, columns]
+
+    def _write(self, rows: np.ndarray, today: int, prices: np.ndarray, demand: np.ndarray) -> None:
+        column = today % self.capacity_days
+        for offset in (column, column + self.capacity_days):
+            self._prices[rows, offset] = prices
+            self._days[rows, offset] = today
+            self._demand[rows, offset] = demand
+
+    def window(self, key: SeriesKey, days: int, today: date) -> np.ndarray:
+        """Prices for the `days` days ending `today`, oldest first, NaN on days without an observation"""
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return np.full(days, np.nan, dtype=np.float32)
+            return self._window(row, today.toordinal(), days)[0]
+
+    def stats(self, key: SeriesKey, days: int, today: date) -> Optional[Tuple[float, float, float]]:
+        """Rolling (min, average, max) price over the `days` days ending `today`, or None if never observed"""
+        prices = self.window(key, days, today)
+        observed = prices[~np.isnan(prices)]
+        if not len(observed):
+            return None
+        return float(observed.min()), float(observed.mean()), float(observed.max())
+
+    def record(self, key: SeriesKey, price: float, today: date, demand: str = "Medium") -> str:
+        """Record one observed price and return its trend against the rolling average before it"""
+        with self._lock:
+            row = self._row_indices([key])
+            reference = self._reference(row, today.toordinal())
+            self._write(row, today.toordinal(), np.float32(price), DEMAND_LEVELS.index(demand))
+        return PRICE_TRENDS[int(trend_codes(np.array([price]), reference)[0])]
+
+    def _reference(self, rows: np.ndarray, today: int) -> np.ndarray:
+        """Average of each series' last PRICE_HISTORY_DAYS days, including any earlier price today"""
+        prices, _ = self._window(rows, today, min(PRICE_HISTORY_DAYS, self.capacity_days))
+        observed = ~np.isnan(prices)
+        counts = observed.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, np.where(observed, prices, 0).sum(axis=1) / counts, np.nan)
+
+    def observe_batch(self, batch: FlightBatch, today: date) -> None:
+        """Record every fare in `batch` and fill its trend and history columns from the store.
+
+        Trends compare each price with its series' rolling average before this
+        observation; fares seen for the first time are stable. The history
+        columns hold the last PRICE_HISTORY_DAYS days, newest first.
+        """
+        day = today.toordinal()
+        days = min(PRICE_HISTORY_DAYS, self.capacity_days)
+        keys = [
+            (f"{AIRLINE_CODES[airline]} {slot}{suffix}", *batch.jobs[job])
+            for airline, slot, suffix, job in zip(batch.airline.tolist(), batch.flight_slot.tolist(),
+                                                  batch.number_suffix.tolist(), batch.job.tolist())
+        ]
+        demand = demand_levels(batch.seats_available)
+        with self._lock:
+            if day != self._last_purge:
+                self._purge(day)
+            rows = self._row_indices(keys)
+            trends = trend_codes(batch.total_price, self._reference(rows, day))
+            self._write(rows, day, batch.total_price, demand)
+            prices, demands = self._window(rows, day, days)
+
+        batch.price_trend = trends.astype(np.uint8)
+        batch.history_price = np.ascontiguousarray(prices[:, ::-1], dtype=np.float32)
+        batch.history_demand = np.ascontiguousarray(demands[:, ::-1], dtype=np.uint8)
+        batch.history_dates = [(today - timedelta(days=offset)).isoformat() for offset in range(days)]
+
+    def purge(self, today: date) -> int:
+        """Drop series for flights that have already departed; returns how many were dropped"""
+        with self._lock:
+            return self._purge(today.toordinal())
+
+    def _purge(self, today: int) -> int:
+        self._last_purge = today
+        count = len(self._rows)
+        keep = np.flatnonzero(self._departures[:count] >= today)
+        if len(keep) == count:
+            return 0
+        keys = sorted(self._rows, key=self._rows.get)
+        self._rows = {keys[row]: new_row for new_row, row in enumerate(keep.tolist())}
+        self._prices, self._days = self._prices[keep], self._days[keep]
+        self._demand, self._departures = self._demand[keep], self._departures[keep]
+        return count - len(keep)
@@ -0,0 +1,111 @@
+"""Shared price lock store"""
+import heapq
+import threading
+import time
+from typing import List, Optional
+
+from .batch import FlightView
+from .models import PRICE_LOCK_MINUTES, PriceLock
+from .storage import MemoryBackend
+
+class PriceLockStore:
+    """Price locks shared by every session, so the same fare can't be locked twice.
+
+    Expiry times are kept in a min-heap, so `purge` removes expired locks in
+    O(log n) each; superseded heap entries are skipped lazily. Locks are also
+    indexed by owner, which makes per-session counts O(1). Callers pass the
+    current time in, so one clock read can serve a whole render.
+    """
+    
+    def __init__(self, backend=None, now: Optional[float] = None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self._locks = {}  # fare key -> PriceLock
+        self._by_owner = {}  # owner -> {fare key: PriceLock}
+        self._expiry_heap = []  # (locked_until, fare key)
+        self._lock = threading.Lock()
+        for lock in self.backend.load_locks(time.time() if now is None else now):
+            self._insert(lock)
+    
+    def _insert(self, lock: PriceLock) -> None:
+        self._locks[lock.fare_key] = lock
+        self._by_owner.setdefault(lock.owner, {})[lock.fare_key] = lock
+        heapq.heappush(self._expiry_heap, (lock.locked_until, lock.fare_key))
+    
+    def purge(self, now: float) -> int:
+        """Drop every lock that expired at or before `now`; returns how many were removed"""
+        removed = 0
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                locked_until, key = heapq.heappop(self._expiry_heap)
+                lock = self._locks.get(key)
+                if lock is None or lock.locked_until != locked_until:
+                    continue  # superseded by a newer lock on the same fare
+                self._discard(lock)
+                removed += 1
+        return removed
+    
+    def _discard(self, lock: PriceLock) -> None:
+        del self._locks[lock.fare_key]
+        owned = self._by_owner[lock.owner]
+        del owned[lock.fare_key]
+        if not owned:
+            del self._by_owner[lock.owner]
+    
+    def acquire(self, key: str, owner: str, flight: FlightView, now: float,
+                minutes: int = PRICE_LOCK_MINUTES) -> Optional[PriceLock]:
+        """Lock a fare for `owner`; returns None if another owner already holds it.
+
+        The backend claim checks and writes in one step, so it also loses to
+        locks taken by other processes sharing the same store; the winning
+        lock is then kept here so later checks on the fare stay local.
+        """
+        self.purge(now)
+        with self._lock:
+            existing = self._locks.get(key)
+            if existing is not None and existing.owner != owner:
+                return None
+            lock = PriceLock(
+                fare_key=key,
+                owner=owner,
+                flight_id=flight.id,
+                flight_number=flight.flight_number,
+                origin=flight.departure_airport.code,
+                destination=flight.arrival_airport.code,
+                departure_date=flight.departure_date,
+                original_price=flight.total_price,
+                locked_until=now + minutes * 60
+            )
+            if not self.backend.claim_lock(lock, now):
+                if existing is not None:
+                    self._discard(existing)  # our copy is stale: the fare changed hands elsewhere
+                held = self.backend.find_lock(key, now)
+                if held is not None:
+                    self._insert(held)
+                return None
+            self._insert(lock)
+        return lock
+    
+    def get(self, key: str, now: float) -> Optional[PriceLock]:
+        lock = self._locks.get(key)
+        if lock is None or lock.locked_until <= now:
+            return None
+        return lock
+    
+    def owned_by(self, owner: str) -> List[PriceLock]:
+        """Locks held by `owner`, soonest expiry first (call `purge` first for an up-to-date view)"""
+        with self._lock:
+            return sorted(self._by_owner.get(owner, {}).values(), key=lambda lock: lock.locked_until)
+    
+    def count(self, owner: Optional[str] = None) -> int:
+        """Number of active locks, overall or for one owner (as of the last `purge`)"""
+        if owner is None:
+            return len(self._locks)
+        return len(self._by_owner.get(owner, ()))
+
+def fare_key(flight: FlightView) -> str:
+    """Identifies one fare across sessions, searches and epochs: flight number, route and departure date"""
+    return f"{flight.flight_number}|{flight.departure_airport.code}-{flight.arrival_airport.code}|{flight.departure_date}"
+
+def get_lock_time_remaining(lock: PriceLock, now: float) -> int:
+    """Get remaining lock time in seconds"""
+    return max(0, int(lock.locked_until - now))
@@ -0,0 +1,157 @@
+"""Per-stage latency instrumentation shared by every session in the process"""
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+PERF_ENV = "CHEEPNOW_PERF"
+# Histogram bucket upper bounds in seconds, Prometheus-style (an implicit +Inf bucket follows)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper bounds"""
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Smallest bucket bound covering fraction `q` of observations, capped at the observed max"""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations at or below it) pairs, ending with +Inf"""
+        pairs = []
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            pairs.append((bound, seen))
+        return pairs
+
+class _NullTimer:
+    """Shared timer returned while recording is disabled: entering and exiting do nothing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _StageTimer:
+    __slots__ = ('recorder', 'stage', 'started')
+
+    def __init__(self, recorder: 'PerfRecorder', stage: str):
+        self.recorder = recorder
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.recorder.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+class PerfRecorder:
+    """Thread-safe per-stage latency histograms.
+
+    `timer(stage)` is a context manager; while the recorder is disabled it
+    returns a shared no-op timer, so instrumented hot paths cost one
+    attribute check and no clock reads.
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms = {}  # stage -> LatencyHistogram
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def timer(self, stage: str):
+        return _StageTimer(self, stage) if self.enabled else _NULL_TIMER
+
+    def timed(self, stage: str, fn):
+        """Wrap `fn` so each call is timed under `stage`, e.g. for executor tasks"""
+        def run(*args, **kwargs):
+            with self.timer(stage):
+                return fn(*args, **kwargs)
+        return run
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict:
+        """Per-stage count, sum, mean, p50/p95/p99, max and cumulative buckets, in seconds"""
+        with self._lock:
+            stages = {}
+            for stage, histogram in sorted(self._histograms.items()):
+                stages[stage] = {
+                    'count': histogram.count,
+                    'sum': histogram.total,
+                    'mean': histogram.total / histogram.count,
+                    'p50': histogram.quantile(0.50),
+                    'p95': histogram.quantile(0.95),
+                    'p99': histogram.quantile(0.99),
+                    'max': histogram.max,
+                    'buckets': histogram.cumulative(),
+                }
+            return {'enabled': self.enabled, 'since': self.started_at, 'stages': stages}
+
+    def to_json(self, snapshot: Optional[Dict] = None) -> str:
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        stages = {
+            stage: dict(stats, buckets=[["+Inf" if bound == float('inf') else bound, count]
+                                        for bound, count in stats['buckets']])
+            for stage, stats in snapshot['stages'].items()
+        }
+        return json.dumps(dict(snapshot, stages=stages), indent=2)
+
+    def to_prometheus(self, snapshot: Optional[Dict] = None, metric: str = "cheepnow_stage_duration_seconds") -> str:
+        """Snapshot in the Prometheus text exposition format, one histogram labelled by stage"""
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        lines = [f"# HELP {metric} Latency of instrumented CheepNow stages.", f"# TYPE {metric} histogram"]
+        for stage, stats in snapshot['stages'].items():
+            for bound, count in stats['buckets']:
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {count}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {stats["sum"]!r}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+PERF_RECORDER = PerfRecorder(enabled=bool(os.environ.get(PERF_ENV)))
+
+def perf_timer(stage: str):
+    """Time a block under `stage` on the process-wide recorder"""
+    return PERF_RECORDER.timer(stage)
@@ -0,0 +1,273 @@
+"""Data models, airline and airport reference data and lookup tables"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+# Enhanced Data Models with more features
+@dataclass
+class Airline:
+    code: str
+    name: str
+    type: str  # 'budget', 'full-service', 'low-cost'
+    carry_on_included: bool
+    checked_baggage_included: bool
+    checked_baggage_weight: int
+    logo: str
+    on_time_performance: float  # 0.0 to 1.0
+    customer_rating: float  # 1.0 to 5.0
+    wifi_available: bool
+    meal_service: bool
+    loyalty_program: str
+
+@dataclass
+class Airport:
+    code: str
+    name: str
+    city: str
+    region: str
+    timezone: str
+    facilities: List[str]
+    distance_from_city: int  # km
+    latitude: float
+    longitude: float
+
+@dataclass
+class PriceHistory:
+    date: str
+    price: float
+    demand_level: str  # 'Low', 'Medium', 'High'
+
+@dataclass
+class Flight:
+    id: str
+    flight_number: str
+    airline: Airline
+    departure_airport: Airport
+    arrival_airport: Airport
+    departure_time: str
+    arrival_time: str
+    duration_minutes: int
+    base_price: float
+    taxes: float
+    total_price: float
+    seats_available: int
+    aircraft: str
+    price_locked_until: Optional[str] = None
+    price_trend: str = "stable"  # 'rising', 'falling', 'stable'
+    carbon_emissions: float = 0.0  # kg CO2
+    price_history: Optional[List[PriceHistory]] = None
+    value_score: float = 0.0
+    recommendation_reason: str = ""
+
+    @property
+    def departure_minutes(self) -> int:
+        hours, minutes = self.departure_time.split(':')
+        return int(hours) * 60 + int(minutes)
+
+# Enhanced Philippine Airlines Data with realistic details
+AIRLINES = {
+    "5J": Airline(
+        code="5J", 
+        name="Cebu Pacific", 
+        type="budget", 
+        carry_on_included=True, 
+        checked_baggage_included=False, 
+        checked_baggage_weight=20, 
+        logo="🟦",
+        on_time_performance=0.82,
+        customer_rating=3.8,
+        wifi_available=False,
+        meal_service=False,
+        loyalty_program="GetGo"
+    ),
+    "PR": Airline(
+        code="PR", 
+        name="Philippine Airlines", 
+        type="full-service", 
+        carry_on_included=True, 
+        checked_baggage_included=True, 
+        checked_baggage_weight=23, 
+        logo="�",
+        on_time_performance=0.78,
+        customer_rating=4.1,
+        wifi_available=True,
+        meal_service=True,
+        loyalty_program="Mabuhay Miles"
+    ),
+    "Z2": Airline(
+        code="Z2", 
+        name="Philippines AirAsia", 
+        type="low-cost", 
+        carry_on_included=True, 
+        checked_baggage_included=False, 
+        checked_baggage_weight=20, 
+        logo="🔴",
+        on_time_performance=0.85,
+        customer_rating=3.9,
+        wifi_available=False,
+        meal_service=False,
+        loyalty_program="BIG Loyalty"
+    ),
+    "M8": Airline(
+        code="M8", 
+        name="Skyjet Airlines", 
+        type="regional", 
+        carry_on_included=True, 
+        checked_baggage_included=False, 
+        checked_baggage_weight=15, 
+        logo="🟨",
+        on_time_performance=0.88,
+        customer_rating=4.2,
+        wifi_available=False,
+        meal_service=True,
+        loyalty_program="Skyjet Rewards"
+    )
+}
+
+AIRPORTS = {
+    "MNL": Airport(
+        code="MNL", 
+        name="Ninoy Aquino International Airport", 
+        city="Manila", 
+        region="Metro Manila",
+        timezone="Asia/Manila",
+        facilities=["WiFi", "Restaurants", "Duty Free", "Lounges", "ATM", "Currency Exchange"],
+        distance_from_city=7,
+        latitude=14.5086,
+        longitude=121.0194
+    ),
+    "CEB": Airport(
+        code="CEB", 
+        name="Mactan-Cebu International Airport", 
+        city="Cebu", 
+        region="Central Visayas",
+        timezone="Asia/Manila",
+        facilities=["WiFi", "Restaurants", "Duty Free", "Car Rental", "ATM"],
+        distance_from_city=12,
+        latitude=10.3075,
+        longitude=123.9794
+    ),
+    "DVO": Airport(
+        code="DVO", 
+        name="Francisco Bangoy International Airport", 
+        city="Davao", 
+        region="Mindanao",
+        timezone="Asia/Manila",
+        facilities=["WiFi", "Restaurants", "ATM", "Car Rental"],
+        distance_from_city=11,
+        latitude=7.1255,
+        longitude=125.6458
+    ),
+    "ILO": Airport(
+        code="ILO", 
+        name="Iloilo International Airport", 
+        city="Iloilo", 
+        region="Western Visayas",
+        timezone="Asia/Manila",
+        facilities=["WiFi", "Restaurants", "ATM"],
+        distance_from_city=18,
+        latitude=10.833,
+        longitude=122.4934
+    ),
+    "BCD": Airport(
+        code="BCD", 
+        name="Bacolod-Silay Airport", 
+        city="Bacolod", 
+        region="Western Visayas",
+        timezone="Asia/Manila",
+        facilities=["WiFi", "Restaurants", "Car Rental"],
+        distance_from_city=16,
+        latitude=10.7764,
+        longitude=123.015
+    ),
+    "TAG": Airport(
+        code="TAG", 
+        name="Tagbilaran Airport", 
+        city="Bohol", 
+        region="Central Visayas",
+        timezone="Asia/Manila",
+        facilities=["WiFi", "Restaurants", "ATM"],
+        distance_from_city=2,
+        latitude=9.6641,
+        longitude=123.8531
+    ),
+    "KLO": Airport(
+        code="KLO", 
+        name="Kalibo International Airport", 
+        city="Kalibo", 
+        region="Western Visayas",
+        timezone="Asia/Manila",
+        facilities=["WiFi", "Restaurants", "ATM", "Duty Free"],
+        distance_from_city=3,
+        latitude=11.6794,
+        longitude=122.376
+    ),
+    "PPS": Airport(
+        code="PPS", 
+        name="Puerto Princesa Airport", 
+        city="Palawan", 
+        region="Mimaropa",
+        timezone="Asia/Manila",
+        facilities=["WiFi", "Restaurants", "ATM"],
+        distance_from_city=2,
+        latitude=9.7421,
+        longitude=118.759
+    )
+}
+
+POPULAR_ROUTES = [
+    ("MNL", "CEB"), ("MNL", "DVO"), ("MNL", "ILO"), ("MNL", "BCD"),
+    ("CEB", "DVO"), ("CEB", "MNL"), ("DVO", "MNL"), ("ILO", "MNL")
+]
+
+PEAK_SEASON_MONTHS = (12, 1, 3, 4, 5)  # Christmas, Summer
+
+# Airline-specific fare multiplier bands (low, high) by airline type
+AIRLINE_TYPE_MULTIPLIERS = {
+    "budget": (0.8, 1.1),
+    "low-cost": (0.85, 1.15),
+    "full-service": (1.1, 1.4),
+    "regional": (1.2, 1.5)
+}
+
+AIRCRAFT_EMISSION_MULTIPLIERS = {
+    "Airbus A320": 1.0,
+    "Boeing 737": 1.05,
+    "ATR 72": 0.8
+}
+
+# Lookup tables for the columnar engine: rows store indices into these
+AIRLINE_CODES = tuple(AIRLINES.keys())
+AIRCRAFT_TYPES = tuple(AIRCRAFT_EMISSION_MULTIPLIERS.keys())
+PRICE_TRENDS = ("stable", "rising", "falling")
+PRICE_TREND_WEIGHTS = (0.6, 0.25, 0.15)  # Most prices are stable
+DEMAND_LEVELS = ("Low", "Medium", "High")
+PRICE_HISTORY_DAYS = 7
+
+# Departure times are stored as minutes since midnight
+MINUTES_PER_DAY = 24 * 60
+SCHEDULE_SCORES_BY_HOUR = np.where((np.arange(24) >= 8) & (np.arange(24) <= 18), 5, 2)  # prefer mid-day flights
+
+def format_clock_minutes(minutes: int) -> str:
+    """Format minutes since midnight as HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def arrival_clock_minutes(departure_minutes, duration_minutes):
+    """Arrival time of day in minutes since midnight; works on scalars and arrays"""
+    return (departure_minutes + duration_minutes) % MINUTES_PER_DAY
+
+# Price locks
+PRICE_LOCK_MINUTES = 15
+
+@dataclass
+class PriceLock:
+    fare_key: str
+    owner: str  # session id of the traveler holding the lock
+    flight_id: str
+    flight_number: str
+    origin: str
+    destination: str
+    departure_date: str
+    original_price: float
+    locked_until: float  # epoch seconds
@@ -0,0 +1,218 @@
+"""Preference filtering, sorting and pagination of a result set"""
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .batch import FlightBatch
+from .models import AIRLINE_CODES, AIRLINES
+
+RESULT_SORTS = {
+    'value': "⭐ Best value",
+    'price': "💰 Lowest price",
+    'departure': "🛫 Earliest departure",
+    'duration': "⏱️ Shortest flight",
+}
+RESULT_PAGE_SIZES = [10, 20, 50]
+
+DEPARTURE_TIME_WINDOWS = {  # minutes since midnight, [start, end)
+    "Any time": None,
+    "Early morning (5-9 AM)": (5 * 60, 9 * 60),
+    "Morning (9-12 PM)": (9 * 60, 12 * 60),
+    "Afternoon (12-6 PM)": (12 * 60, 18 * 60),
+    "Evening (6-10 PM)": (18 * 60, 22 * 60),
+    "Late night (10 PM+)": (22 * 60, 24 * 60),
+}
+ECO_KG_PER_VALUE_POINT = 10  # eco-conscious ranking: every 10 kg CO₂ costs one value point
+SUMMARY_TOP_K = 5
+SUMMARY_LEADERS = {
+    'price': "💰 Cheapest",
+    'value': "⭐ Best value",
+    'eco': "🌱 Lowest CO₂",
+}
+CARRY_ON_INCLUDED = np.array([AIRLINES[code].carry_on_included for code in AIRLINE_CODES])
+
+def sort_flight_indices(batch: FlightBatch, sort_by: str) -> np.ndarray:
+    """Row order for the results list; ties keep the batch (value score) order"""
+    if sort_by == 'price':
+        key = batch.total_price
+    elif sort_by == 'departure':
+        key = batch.departure_minutes
+    elif sort_by == 'duration':
+        key = batch.duration_minutes
+    elif sort_by == 'eco_value':
+        key = batch.carbon_emissions / ECO_KG_PER_VALUE_POINT - batch.value_score
+    else:
+        key = -batch.value_score
+    return np.argsort(key, kind="stable")
+
+SORT_ORDER_KEYS = tuple(RESULT_SORTS) + ('eco_value',)
+
+class SortOrders(Mapping):
+    """Row order for every results sort, each one built on first use and then kept.
+
+    A render only needs the sort mode on screen, so a search doesn't pay for
+    the others up front. The departure-time index is built the same way, from
+    the departure order. Two sessions asking for a missing order at once may
+    both build it; they build the same array, so either copy can be kept.
+    """
+    
+    def __init__(self, batch: FlightBatch, known: Optional[Dict[str, np.ndarray]] = None):
+        self._batch = batch
+        self._orders = dict(known or {})
+        self._departure_index = None
+    
+    def __getitem__(self, sort_by: str) -> np.ndarray:
+        order = self._orders.get(sort_by)
+        if order is None:
+            if sort_by not in SORT_ORDER_KEYS:
+                raise KeyError(sort_by)
+            order = self._orders[sort_by] = sort_flight_indices(self._batch, sort_by)
+        return order
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(SORT_ORDER_KEYS)
+    
+    def __len__(self) -> int:
+        return len(SORT_ORDER_KEYS)
+    
+    @property
+    def departure_index(self) -> 'DepartureIndex':
+        if self._departure_index is None:
+            self._departure_index = build_departure_index(self._batch, self['departure'])
+        return self._departure_index
+
+def build_sort_orders(batch: FlightBatch, ranked: bool = False) -> SortOrders:
+    """Lazy row orders for every results sort.
+
+    A `ranked` batch (from `rank_batch`) is already in value order, so its
+    value sort is the identity and never has to be computed.
+    """
+    known = {'value': np.arange(len(batch))} if ranked else None
+    return SortOrders(batch, known)
+
+@dataclass(frozen=True)
+class DepartureIndex:
+    """Departure-time index over one result set.
+
+    `order` lists the rows by departure time and `minutes` holds their sorted
+    departure minutes, so any time window is a pair of binary searches.
+    `hour_starts[h]` is the number of flights departing before hour `h`,
+    which answers whole-hour window counts in O(1).
+    """
+    order: np.ndarray
+    minutes: np.ndarray
+    hour_starts: np.ndarray  # length 25, cumulative hour-bucket histogram
+    
+    def _bounds(self, start: int, end: int) -> Tuple[int, int]:
+        if start % 60 == 0 and end % 60 == 0:
+            return int(self.hour_starts[start // 60]), int(self.hour_starts[end // 60])
+        return (int(np.searchsorted(self.minutes, start, side='left')),
+                int(np.searchsorted(self.minutes, end, side='left')))
+    
+    def count_between(self, start: int, end: int) -> int:
+        """Number of flights departing in [start, end) minutes since midnight"""
+        lo, hi = self._bounds(start, end)
+        return hi - lo
+    
+    def rows_between(self, start: int, end: int) -> np.ndarray:
+        """Rows departing in [start, end) minutes since midnight, earliest first"""
+        lo, hi = self._bounds(start, end)
+        return self.order[lo:hi]
+
+def build_departure_index(batch: FlightBatch, order: Optional[np.ndarray] = None) -> DepartureIndex:
+    """Index a result set by departure time, reusing a precomputed departure order when given"""
+    order = order if order is not None else sort_flight_indices(batch, 'departure')
+    hour_counts = np.bincount(batch.departure_minutes // 60, minlength=24)
+    return DepartureIndex(
+        order=order,
+        minutes=batch.departure_minutes[order],
+        hour_starts=np.concatenate(([0], np.cumsum(hour_counts)))
+    )
+
+def preference_mask(batch: FlightBatch, preferences: Dict,
+                    departure_index: Optional[DepartureIndex] = None) -> np.ndarray:
+    """Boolean row mask for the budget, departure window and preferred airline preferences"""
+    mask = batch.total_price <= preferences['max_budget']
+    
+    window = DEPARTURE_TIME_WINDOWS.get(preferences['preferred_departure_time'])
+    if window is not None:
+        departure_index = departure_index if departure_index is not None else build_departure_index(batch)
+        in_window = np.zeros(len(batch), dtype=bool)
+        in_window[departure_index.rows_between(*window)] = True
+        mask &= in_window
+    
+    if preferences['preferred_airlines']:
+        preferred = [AIRLINE_CODES.index(code) for code in preferences['preferred_airlines']]
+        mask &= np.isin(batch.airline, preferred)
+    return mask
+
+def apply_preferences(batch: FlightBatch, sort_orders: Dict[str, np.ndarray], preferences: Dict,
+                      sort_by: str = 'value', departure_index: Optional[DepartureIndex] = None) -> np.ndarray:
+    """Rows matching the user's preferences, in display order.
+
+    Eco-conscious travelers get the value ranking adjusted for CO₂. Sorting
+    reuses the result set's sort orders, so re-filtering is a single O(n) mask.
+    """
+    if sort_by == 'value' and preferences['eco_conscious']:
+        sort_by = 'eco_value'
+    order = sort_orders[sort_by]
+    return order[preference_mask(batch, preferences, departure_index)[order]]
+
+def paginate(total: int, page: int, page_size: int) -> Tuple[int, int, int, int]:
+    """Clamp `page` to the available pages; returns (start, stop, page, page_count)"""
+    page_count = max(1, -(-total // page_size))
+    page = min(max(page, 0), page_count - 1)
+    start = page * page_size
+    return start, min(start + page_size, total), page, page_count
+
+# Header metrics and leaders
+def top_k_rows(key: np.ndarray, k: int) -> np.ndarray:
+    """Rows of the k smallest keys, smallest first, ties by row; O(n) partition plus an O(k log k) sort"""
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= len(key):
+        return np.argsort(key, kind="stable")
+    if k == 1:
+        return np.array([np.argmin(key)])
+    # Every row tied with the k-th smallest key is a candidate, so ties resolve by row as in a stable sort
+    candidates = np.flatnonzero(key <= np.partition(key, k - 1)[k - 1])
+    return candidates[np.lexsort((candidates, key[candidates]))][:k]
+
+@dataclass(frozen=True)
+class ResultSummary:
+    """Header metrics and the top rows by price, value score and CO₂ for one result set"""
+    count: int
+    average_price: float
+    carry_on_included: int
+    average_emissions: float
+    leaders: Dict[str, np.ndarray]  # SUMMARY_LEADERS key -> up to `k` rows, best first
+
+    @property
+    def cheapest(self) -> int:
+        return int(self.leaders['price'][0])
+
+    @property
+    def best_value(self) -> int:
+        return int(self.leaders['value'][0])
+
+    @property
+    def eco(self) -> int:
+        return int(self.leaders['eco'][0])
+
+def summarize_results(batch: FlightBatch, k: int = SUMMARY_TOP_K) -> Optional[ResultSummary]:
+    """Every header metric and top-k leader from column reductions, without sorting the batch; None if empty"""
+    if not len(batch):
+        return None
+    return ResultSummary(
+        count=len(batch),
+        average_price=float(batch.total_price.mean()),
+        carry_on_included=int(np.count_nonzero(CARRY_ON_INCLUDED[batch.airline])),
+        average_emissions=float(batch.carbon_emissions.mean()),
+        leaders={
+            'price': top_k_rows(batch.total_price, k),
+            'value': top_k_rows(-batch.value_score, k),
+            'eco': top_k_rows(batch.carbon_emissions, k),
+        }
+    )
@@ -0,0 +1,45 @@
+"""Deterministic, independent random streams for searches and sessions"""
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .cache import SEARCH_CACHE_TTL_SECONDS
+
+# Fares for a search key are regenerated once per epoch bucket, as often as cached results expire
+SEED_EPOCH_SECONDS = SEARCH_CACHE_TTL_SECONDS
+
+def epoch_bucket(now: float, seconds: float = SEED_EPOCH_SECONDS) -> int:
+    """Index of the seeding epoch containing `now` (epoch seconds)"""
+    return int(now // seconds)
+
+def stable_seed(*parts) -> int:
+    """64-bit seed derived from `parts`, identical across processes and restarts"""
+    digest = hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+@dataclass(frozen=True)
+class SearchStreams:
+    """One independent generator per randomized subsystem of a search.
+
+    Streams are spawned from a single SeedSequence, so each subsystem draws
+    the same numbers for the same seed no matter how many numbers the others
+    consume or which worker thread or process runs it.
+    """
+    generation: np.random.Generator
+    recommendations: np.random.Generator
+    manipulation: np.random.Generator
+
+def spawn_streams(seed: Optional[int] = None) -> SearchStreams:
+    """Streams for one search; `seed=None` draws fresh OS entropy"""
+    generation, recommendations, manipulation = np.random.SeedSequence(seed).spawn(3)
+    return SearchStreams(
+        generation=np.random.default_rng(generation),
+        recommendations=np.random.default_rng(recommendations),
+        manipulation=np.random.default_rng(manipulation)
+    )
+
+def session_rng(session_id: str, *parts) -> np.random.Generator:
+    """Generator for per-session UI figures, stable for the same session and `parts`"""
+    return np.random.default_rng(stable_seed("session", session_id, *parts))
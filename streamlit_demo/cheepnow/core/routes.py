@@ -0,0 +1,71 @@
+"""Great-circle route table for every ordered pair of airports"""
+import math
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .models import AIRPORTS, Airport
+
+# Precomputed route table covering every ordered pair of AIRPORTS
+EARTH_RADIUS_KM = 6371.0
+BASE_FARE_FIXED = 1950  # ₱, fixed cost component of a one-way fare
+BASE_FARE_PER_KM = 2.5  # ₱ per great-circle km
+CRUISE_KM_PER_MINUTE = 8
+MIN_FLIGHT_MINUTES = 90
+
+@dataclass(frozen=True)
+class RouteInfo:
+    distance_km: float
+    base_fare: float
+    typical_duration_minutes: int
+
+def great_circle_km(a: Airport, b: Airport) -> float:
+    """Great-circle (haversine) distance between two airports"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a.latitude, a.longitude, b.latitude, b.longitude))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+def build_route_table(airports: Dict[str, Airport]) -> Dict[Tuple[str, str], RouteInfo]:
+    """Distance, base fare and typical duration for every ordered airport pair.
+
+    Each unordered pair is computed once and stored under both directions,
+    so lookups are symmetric.
+    """
+    table = {}
+    codes = list(airports)
+    for i, origin in enumerate(codes):
+        for destination in codes[i + 1:]:
+            distance = great_circle_km(airports[origin], airports[destination])
+            route = RouteInfo(
+                distance_km=round(distance, 1),
+                base_fare=round((BASE_FARE_FIXED + BASE_FARE_PER_KM * distance) / 50) * 50,
+                typical_duration_minutes=max(MIN_FLIGHT_MINUTES, int(distance / CRUISE_KM_PER_MINUTE))
+            )
+            table[(origin, destination)] = route
+            table[(destination, origin)] = route
+    return table
+
+ROUTE_TABLE = MappingProxyType(build_route_table(AIRPORTS))
+
+def get_route(origin: str, destination: str) -> RouteInfo:
+    """O(1) route lookup; raises KeyError for unknown airports or origin == destination"""
+    return ROUTE_TABLE[(origin, destination)]
+
+# Dense, read-only copies of the route table for the columnar engine,
+# indexed by each airport's position in AIRPORT_CODES
+AIRPORT_CODES = tuple(AIRPORTS.keys())
+AIRPORT_INDEX = MappingProxyType({code: i for i, code in enumerate(AIRPORT_CODES)})
+
+def _route_matrix(attribute: str) -> np.ndarray:
+    matrix = np.zeros((len(AIRPORT_CODES), len(AIRPORT_CODES)))
+    for (origin, destination), route in ROUTE_TABLE.items():
+        matrix[AIRPORT_INDEX[origin], AIRPORT_INDEX[destination]] = getattr(route, attribute)
+    matrix.setflags(write=False)
+    return matrix
+
+ROUTE_DISTANCE_MATRIX = _route_matrix('distance_km')
+ROUTE_FARE_MATRIX = _route_matrix('base_fare')
+ROUTE_DURATION_MATRIX = _route_matrix('typical_duration_minutes').astype(np.int64)
+ROUTE_DURATION_MATRIX.setflags(write=False)
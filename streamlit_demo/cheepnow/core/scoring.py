@@ -0,0 +1,104 @@
+"""Value scoring and personalized recommendation reasons"""
+from typing import List, Optional
+
+import numpy as np
+
+from .batch import RECOMMENDATION_REASONS, FlightBatch
+from .models import AIRLINE_CODES, AIRLINES, PRICE_TRENDS, SCHEDULE_SCORES_BY_HOUR, Airline, Flight
+
+def score_flight_batch(batch: FlightBatch) -> np.ndarray:
+    """Calculate comprehensive value scores for every flight in one vectorized pass.
+
+    Price bounds are computed once per job over the complete result set, so
+    scores are deterministic and independent of the order flights were generated in.
+    """
+    n_jobs = len(batch.jobs)
+    min_price = np.full(n_jobs, np.inf)
+    max_price = np.full(n_jobs, -np.inf)
+    np.minimum.at(min_price, batch.job, batch.total_price)
+    np.maximum.at(max_price, batch.job, batch.total_price)
+    max_price = max_price[batch.job] + 1000
+    min_price = min_price[batch.job] - 1000
+    
+    # Price score (lower price = higher score)
+    price_score = (max_price - batch.total_price) / (max_price - min_price) * 40
+    
+    # Airline features, on-time performance and customer rating scores
+    airline_score = AIRLINE_VALUE_SCORES[batch.airline]
+    
+    # Environmental score (lower emissions = higher score)
+    env_score = np.maximum(0, 10 - batch.carbon_emissions / 100)
+    
+    # Schedule convenience (prefer mid-day flights)
+    schedule_score = SCHEDULE_SCORES_BY_HOUR[batch.departure_minutes // 60]
+    
+    total_score = price_score + airline_score + env_score + schedule_score
+    return np.clip(total_score, 0, 100)
+
+def calculate_value_score(flight: Flight, flights: List[Flight]) -> float:
+    """Calculate comprehensive value score for a single flight against its full result set"""
+    max_price = max([f.total_price for f in flights], default=flight.total_price) + 1000
+    min_price = min([f.total_price for f in flights], default=flight.total_price) - 1000
+    
+    # Price score (lower price = higher score)
+    price_score = (max_price - flight.total_price) / (max_price - min_price) * 40
+    
+    # Airline features, on-time performance and customer rating scores
+    airline_score = calculate_airline_value_score(flight.airline)
+    
+    # Environmental score (lower emissions = higher score)
+    env_score = max(0, 10 - (flight.carbon_emissions / 100))
+    
+    # Schedule convenience (prefer mid-day flights)
+    schedule_score = SCHEDULE_SCORES_BY_HOUR[flight.departure_minutes // 60]
+    
+    total_score = price_score + airline_score + env_score + schedule_score
+    return min(100, max(0, total_score))
+
+def calculate_airline_value_score(airline: Airline) -> float:
+    """Price-independent part of the value score: features, punctuality and rating"""
+    # Airline features score
+    feature_score = 0
+    if airline.carry_on_included:
+        feature_score += 15
+    if airline.checked_baggage_included:
+        feature_score += 10
+    if airline.wifi_available:
+        feature_score += 5
+    if airline.meal_service:
+        feature_score += 5
+    
+    # On-time performance score
+    performance_score = airline.on_time_performance * 15
+    
+    # Customer rating score
+    rating_score = (airline.customer_rating / 5.0) * 10
+    
+    return feature_score + performance_score + rating_score
+
+AIRLINE_VALUE_SCORES = np.array([calculate_airline_value_score(AIRLINES[code]) for code in AIRLINE_CODES])
+
+def assign_recommendation_reasons(batch: FlightBatch, rng: Optional[np.random.Generator] = None) -> None:
+    """Pick a personalized recommendation reason for every flight in the batch.
+
+    Each flight gets one of the reasons that apply to it, chosen uniformly at
+    random, or "competitive pricing" when none apply.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    airlines = [AIRLINES[code] for code in AIRLINE_CODES]
+    punctual = np.array([a.on_time_performance > 0.85 for a in airlines])
+    all_baggage = np.array([a.carry_on_included and a.checked_baggage_included for a in airlines])
+    well_rated = np.array([a.customer_rating > 4.0 for a in airlines])
+    
+    applies = np.column_stack([
+        punctual[batch.airline],
+        all_baggage[batch.airline],
+        batch.carbon_emissions < 80,
+        well_rated[batch.airline],
+        batch.price_trend == PRICE_TRENDS.index("falling")
+    ])
+    counts = applies.sum(axis=1)
+    pick = (rng.random(len(batch)) * counts).astype(np.int64)
+    # Index of the (pick + 1)-th applicable reason in each row
+    reason = np.argmax(np.cumsum(applies, axis=1) > pick[:, None], axis=1)
+    batch.reason = np.where(counts > 0, reason, len(RECOMMENDATION_REASONS) - 1).astype(np.uint8)
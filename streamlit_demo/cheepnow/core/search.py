@@ -0,0 +1,275 @@
+"""Search pipeline, flexible-dates fan-out and round-trip ranking"""
+import heapq
+import time
+from concurrent.futures import Executor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .alerts import PriceAlertEngine
+from .batch import FlightBatch, FlightView, batch_fingerprint
+from .cache import SearchCache
+from .frames import build_flights_frame
+from .generation import generate_flight_batch, rank_batch, simulate_anti_manipulation
+from .history import PriceHistoryStore
+from .metrics import PERF_RECORDER, perf_timer
+from .results import DepartureIndex, ResultSummary, SortOrders, build_sort_orders, summarize_results
+from .rng import epoch_bucket, spawn_streams, stable_seed
+from .scoring import assign_recommendation_reasons
+
+# Search pipeline
+@dataclass
+class SearchResult:
+    flights: FlightBatch
+    frame: pd.DataFrame
+    sort_orders: SortOrders
+    manipulation_data: Dict
+    fingerprint: str
+    summary: Optional[ResultSummary] = None
+    
+    @property
+    def departure_index(self) -> DepartureIndex:
+        return self.sort_orders.departure_index
+
+SEARCH_STAGES = {
+    'generation': "Fetching clean pricing data...",
+    'scoring': "Scoring value across all fares...",
+    'recommendations': "Preparing personalized recommendations...",
+    'charts': "Building price analysis...",
+}
+CACHED_SEARCH_MESSAGE = "Serving fresh results from shared cache..."
+
+def run_search_pipeline(origin: str, destination: str, departure_date: str, executor: Executor,
+                        on_progress=None, seed: Optional[int] = None,
+                        history: Optional[PriceHistoryStore] = None, today: Optional[date] = None,
+                        alerts: Optional[PriceAlertEngine] = None) -> SearchResult:
+    """Run the search stages, reporting progress as each stage completes.
+
+    Generation, history and scoring each need the previous stage's output, so
+    they run directly on the calling thread. `executor` only runs the work
+    that can overlap them: the anti-manipulation report, and then the
+    recommendations and flights frame built side by side.
+
+    `on_progress(message, fraction)` is always called from the calling thread,
+    so it may safely update Streamlit elements. Passing a `seed` makes the
+    generated fares reproducible: generation, recommendation reasons and the
+    anti-manipulation report each draw from their own spawned stream. With a
+    `history` store, the fares are recorded as observed on `today` and their
+    trends and price history come from the store. The ranked fares are then
+    checked against every registered price alert in `alerts`.
+    """
+    completed = []
+    
+    def report(stage: str) -> None:
+        completed.append(stage)
+        if on_progress is not None:
+            on_progress(SEARCH_STAGES[stage], len(completed) / len(SEARCH_STAGES))
+    
+    streams = spawn_streams(seed)
+    manipulation_future = executor.submit(simulate_anti_manipulation, streams.manipulation)
+    
+    with perf_timer('search.generation'):
+        batch = generate_flight_batch([(origin, destination, departure_date)], streams.generation)
+    if history is not None:
+        with perf_timer('search.history'):
+            history.observe_batch(batch, today or date.today())
+    report('generation')
+    
+    with perf_timer('search.scoring'):
+        flights = rank_batch(batch)
+    report('scoring')
+    
+    # Recommendations and the flights frame touch different columns of the ranked batch, so build them concurrently
+    timed = PERF_RECORDER.timed
+    stage_futures = {
+        executor.submit(timed('search.recommendations', assign_recommendation_reasons), flights,
+                        streams.recommendations): 'recommendations',
+        executor.submit(timed('search.frame', build_flights_frame), flights): 'charts',
+    }
+    frame = None
+    for future in as_completed(stage_futures):
+        if stage_futures[future] == 'charts':
+            frame = future.result()
+        else:
+            future.result()
+        report(stage_futures[future])
+    
+    if alerts is not None:
+        with perf_timer('search.alerts'):
+            alerts.evaluate(flights)
+    
+    with perf_timer('search.indexes'):
+        sort_orders = build_sort_orders(flights, ranked=True)
+        fingerprint = batch_fingerprint(flights)
+    with perf_timer('search.summary'):
+        summary = summarize_results(flights)
+    return SearchResult(flights=flights, frame=frame, sort_orders=sort_orders,
+                        manipulation_data=manipulation_future.result(), fingerprint=fingerprint, summary=summary)
+
+def search_cache_key(origin: str, destination: str, departure_date: str, epoch: int) -> Tuple:
+    """Identifies one search: route, date and the seeding epoch bucket.
+
+    Party size is not part of it: a flight's schedule and fare don't depend on
+    it, so every party shares one cached result, one history series and one
+    alert check per flight. Passenger counts only matter when presenting fares.
+    """
+    return (origin, destination, str(departure_date), int(epoch))
+
+def search_seed(key: Tuple) -> int:
+    """Stable RNG seed for a search key, identical across processes and restarts"""
+    return stable_seed(*key)
+
+def search_flights(origin: str, destination: str, departure_date: str,
+                   executor: Executor, cache: SearchCache, on_progress=None,
+                   now: Optional[float] = None, history: Optional[PriceHistoryStore] = None,
+                   alerts: Optional[PriceAlertEngine] = None) -> Tuple[SearchResult, bool]:
+    """Cached search entry point. Returns the result and whether it was served from cache.
+
+    Fares are a pure function of the route and date, so every search for them
+    gives identical flights and prices within an epoch bucket of `now`. Only
+    cache misses are recorded in `history` and checked against `alerts`,
+    once per key and epoch.
+    """
+    now = now if now is not None else time.time()
+    epoch = epoch_bucket(now)
+    key = search_cache_key(origin, destination, departure_date, epoch)
+    with perf_timer('search.cache_lookup'):
+        result = cache.get(key)
+    if result is not None:
+        if on_progress is not None:
+            on_progress(CACHED_SEARCH_MESSAGE, 1.0)
+        return result, True
+    
+    with perf_timer('search.pipeline'):
+        result = run_search_pipeline(origin, destination, str(departure_date), executor,
+                                     on_progress=on_progress, seed=search_seed(key),
+                                     history=history, today=date.fromtimestamp(now), alerts=alerts)
+    cache.put(key, result)
+    return result, False
+
+# Flexible-dates fare matrix
+FLEXIBLE_DATE_DAYS = 3
+
+@dataclass
+class FareMatrixCell:
+    date: str
+    cheapest_price: float
+    best_value_score: float
+    flights_found: int
+
+def flexible_search_dates(departure_date: str, days: int = FLEXIBLE_DATE_DAYS, earliest: Optional[str] = None) -> List[str]:
+    """Dates within ±`days` of `departure_date`, skipping any before `earliest`"""
+    center = datetime.strptime(departure_date, "%Y-%m-%d")
+    dates = [(center + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(-days, days + 1)]
+    return [d for d in dates if earliest is None or d >= earliest]
+
+def search_flexible_dates(origin: str, destination: str, departure_date: str,
+                          fanout_executor: Executor, executor: Executor, cache: SearchCache,
+                          days: int = FLEXIBLE_DATE_DAYS, earliest: Optional[str] = None,
+                          on_progress=None, now: Optional[float] = None,
+                          history: Optional[PriceHistoryStore] = None,
+                          alerts: Optional[PriceAlertEngine] = None) -> Dict[str, SearchResult]:
+    """Search every day around `departure_date` in parallel, returning results by date.
+
+    Each day goes through `search_flights`, so days are cached individually and
+    overlapping matrices reuse each other's results. Day searches run on
+    `fanout_executor` while their pipeline stages run on `executor`; keeping the
+    two pools separate means a day search never waits on its own pool.
+    """
+    dates = flexible_search_dates(departure_date, days, earliest)
+    now = now if now is not None else time.time()
+    day_futures = {
+        fanout_executor.submit(search_flights, origin, destination, day, executor, cache,
+                               now=now, history=history, alerts=alerts): day
+        for day in dates
+    }
+    results = {}
+    for future in as_completed(day_futures):
+        day = day_futures[future]
+        results[day], _ = future.result()
+        if on_progress is not None:
+            on_progress(f"Fetched fares for {day}...", len(results) / len(dates))
+    return {day: results[day] for day in dates}
+
+def build_fare_matrix(results: Dict[str, SearchResult]) -> List[FareMatrixCell]:
+    """Cheapest price and best value score for each searched date"""
+    return [
+        FareMatrixCell(
+            date=day,
+            cheapest_price=float(result.flights.total_price.min()),
+            best_value_score=float(result.flights.value_score.max()),
+            flights_found=len(result.flights)
+        )
+        for day, result in results.items() if len(result.flights)
+    ]
+
+# Round-trip search
+ROUND_TRIP_TOP_K = 5
+ROUND_TRIP_RANKINGS = {
+    'price': "💰 Lowest total price",
+    'value': "⭐ Best combined value",
+}
+
+@dataclass
+class RoundTripOption:
+    outbound: FlightView
+    inbound: FlightView
+    total_price: float
+    combined_score: float  # average value score of both legs
+
+def top_k_pair_sums(first: List[float], second: List[float], k: int) -> List[Tuple[int, int]]:
+    """Index pairs (i, j) with the k smallest first[i] + second[j], smallest first.
+
+    Both lists must be sorted ascending. Only the frontier of candidate pairs is
+    kept in a heap, so this costs O(k log k) instead of enumerating every pair.
+    """
+    if not first or not second or k <= 0:
+        return []
+    heap = [(first[0] + second[0], 0, 0)]
+    seen = {(0, 0)}
+    pairs = []
+    while heap and len(pairs) < k:
+        _, i, j = heapq.heappop(heap)
+        pairs.append((i, j))
+        for ni, nj in ((i + 1, j), (i, j + 1)):
+            if ni < len(first) and nj < len(second) and (ni, nj) not in seen:
+                seen.add((ni, nj))
+                heapq.heappush(heap, (first[ni] + second[nj], ni, nj))
+    return pairs
+
+def rank_round_trips(outbound: FlightBatch, inbound: FlightBatch, k: int = ROUND_TRIP_TOP_K,
+                     rank_by: str = 'price') -> List[RoundTripOption]:
+    """Best k outbound/return combinations by total price or combined value score"""
+    if rank_by == 'price':
+        outbound_key, inbound_key = outbound.total_price, inbound.total_price
+    else:
+        outbound_key, inbound_key = -outbound.value_score, -inbound.value_score
+    outbound_order = np.argsort(outbound_key, kind="stable")
+    inbound_order = np.argsort(inbound_key, kind="stable")
+    pairs = top_k_pair_sums(outbound_key[outbound_order].tolist(), inbound_key[inbound_order].tolist(), k)
+    options = []
+    for i, j in pairs:
+        out_flight, in_flight = outbound[int(outbound_order[i])], inbound[int(inbound_order[j])]
+        options.append(RoundTripOption(
+            outbound=out_flight,
+            inbound=in_flight,
+            total_price=out_flight.total_price + in_flight.total_price,
+            combined_score=(out_flight.value_score + in_flight.value_score) / 2
+        ))
+    return options
+
+def search_round_trip(origin: str, destination: str, departure_date: str, return_date: str,
+                      fanout_executor: Executor, executor: Executor, cache: SearchCache,
+                      now: Optional[float] = None,
+                      history: Optional[PriceHistoryStore] = None,
+                      alerts: Optional[PriceAlertEngine] = None) -> Tuple[SearchResult, SearchResult]:
+    """Search the outbound and return legs in parallel through the shared cache"""
+    now = now if now is not None else time.time()
+    outbound = fanout_executor.submit(search_flights, origin, destination, departure_date, executor, cache,
+                                      now=now, history=history, alerts=alerts)
+    inbound = fanout_executor.submit(search_flights, destination, origin, return_date, executor, cache,
+                                     now=now, history=history, alerts=alerts)
+    return outbound.result()[0], inbound.result()[0]
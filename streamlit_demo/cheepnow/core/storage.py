@@ -0,0 +1,299 @@
+"""Persistence for price locks, search history and price alerts"""
+import atexit
+import heapq
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .models import PriceLock
+
+STORAGE_PATH_ENV = "CHEEPNOW_DB_PATH"
+STORAGE_FLUSH_SECONDS = 0.5
+STORAGE_BATCH_MAX = 500
+STORAGE_WRITE_ATTEMPTS = 3  # tries per batch while another process holds the write lock
+
+logger = logging.getLogger(__name__)
+
+class MemoryBackend:
+    """Default storage backend: state lives only as long as the process"""
+    
+    def __init__(self):
+        self._locks = {}
+        self._lock_expiry = []  # (locked_until, fare key), swept on every claim and load
+        self._search_history = {}
+        self._price_alerts = {}  # alert id -> alert record
+        self._lock = threading.Lock()
+    
+    def claim_lock(self, lock: PriceLock, now: float) -> bool:
+        """Store `lock` unless another owner holds the fare past `now`; returns whether it was stored"""
+        with self._lock:
+            self._sweep_locks(now)
+            held = self._locks.get(lock.fare_key)
+            if held is not None and held.owner != lock.owner:
+                return False
+            self._locks[lock.fare_key] = lock
+            heapq.heappush(self._lock_expiry, (lock.locked_until, lock.fare_key))
+            return True
+    
+    def _sweep_locks(self, now: float) -> None:
+        while self._lock_expiry and self._lock_expiry[0][0] <= now:
+            locked_until, key = heapq.heappop(self._lock_expiry)
+            lock = self._locks.get(key)
+            if lock is not None and lock.locked_until == locked_until:
+                del self._locks[key]
+    
+    def find_lock(self, fare_key: str, now: float) -> Optional[PriceLock]:
+        lock = self._locks.get(fare_key)
+        return lock if lock is not None and lock.locked_until > now else None
+    
+    def load_locks(self, now: float) -> List[PriceLock]:
+        with self._lock:
+            self._sweep_locks(now)
+            return list(self._locks.values())
+    
+    def append_search(self, session_id: str, record: Dict) -> None:
+        with self._lock:
+            self._search_history.setdefault(session_id, []).append(record)
+    
+    def load_search_history(self, session_id: str, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            return list(self._search_history.get(session_id, [])[-limit:])
+    
+    def save_price_alert(self, alert: Dict) -> None:
+        with self._lock:
+            self._price_alerts[alert['alert_id']] = dict(alert)
+    
+    def delete_price_alerts(self, alert_ids: List[str]) -> None:
+        with self._lock:
+            for alert_id in alert_ids:
+                self._price_alerts.pop(alert_id, None)
+    
+    def load_price_alerts(self) -> List[Dict]:
+        with self._lock:
+            return [dict(alert) for alert in self._price_alerts.values()]
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        pass
+    
+    def close(self) -> None:
+        pass
+
+class SQLiteBackend:
+    """SQLite (WAL mode) storage backend with batched background writes.
+
+    Search history and alert writes are queued and applied by a single writer
+    thread, at most every STORAGE_FLUSH_SECONDS, in one transaction, so
+    callers never wait on disk. Lock claims are the exception: they run as a
+    conditional upsert on the caller's thread, because the caller has to know
+    whether it won the fare. Reads and claims use per-thread connections; WAL
+    lets them run alongside the writer, and other processes on the same host
+    can share the file. A batch that keeps failing is logged and dropped,
+    retrying row by row so one bad write can't take the others with it; the
+    writer itself never stops until `close`, which also runs at interpreter
+    exit so queued writes aren't lost.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS price_locks (
+            fare_key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            flight_id TEXT NOT NULL,
+            flight_number TEXT NOT NULL,
+            origin TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            departure_date TEXT NOT NULL,
+            original_price REAL NOT NULL,
+            locked_until REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_price_locks_flight_id ON price_locks (flight_id);
+        CREATE INDEX IF NOT EXISTS idx_price_locks_locked_until ON price_locks (locked_until);
+        CREATE TABLE IF NOT EXISTS search_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            route TEXT NOT NULL,
+            date TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_search_history_session ON search_history (session_id, id);
+        CREATE TABLE IF NOT EXISTS price_alerts (
+            alert_id TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            origin TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            threshold REAL NOT NULL,
+            departure_date TEXT,
+            flight_number TEXT,
+            created_at REAL NOT NULL
+        );
+    """
+    ALERT_COLUMNS = ('alert_id', 'owner', 'origin', 'destination', 'threshold', 'departure_date', 'flight_number',
+                     'created_at')
+    
+    def __init__(self, path: str, flush_seconds: float = STORAGE_FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._closed = False
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="cheepnow-sqlite-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+    
+    # Lock claims: synchronous, on the calling thread's connection
+    def claim_lock(self, lock: PriceLock, now: float) -> bool:
+        """Store `lock` unless another owner holds the fare past `now`; returns whether it was stored.
+
+        The ownership check and the write are one statement, so two processes
+        racing for the same fare can't both win. Expired locks are swept in
+        the same transaction.
+        """
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                """INSERT INTO price_locks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(fare_key) DO UPDATE SET
+                       owner = excluded.owner, flight_id = excluded.flight_id,
+                       flight_number = excluded.flight_number, origin = excluded.origin,
+                       destination = excluded.destination, departure_date = excluded.departure_date,
+                       original_price = excluded.original_price, locked_until = excluded.locked_until
+                   WHERE price_locks.owner = excluded.owner OR price_locks.locked_until <= ?""",
+                (lock.fare_key, lock.owner, lock.flight_id, lock.flight_number, lock.origin, lock.destination,
+                 lock.departure_date, lock.original_price, lock.locked_until, now)
+            )
+            conn.execute("DELETE FROM price_locks WHERE locked_until <= ?", (now,))
+        return cursor.rowcount == 1
+    
+    # Writes: queued, applied by the writer thread
+    def append_search(self, session_id: str, record: Dict) -> None:
+        self._queue.put(('search', (session_id, record['route'], record['date'], record['timestamp'])))
+    
+    def save_price_alert(self, alert: Dict) -> None:
+        self._queue.put(('alert', tuple(alert[column] for column in self.ALERT_COLUMNS)))
+    
+    def delete_price_alerts(self, alert_ids: List[str]) -> None:
+        for alert_id in alert_ids:
+            self._queue.put(('alert_delete', alert_id))
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every write queued so far has been committed or dropped"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        done.wait(timeout)
+    
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(('close', None))
+            self._writer.join()
+            atexit.unregister(self.close)
+    
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        running = True
+        while running:
+            ops = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(ops) < STORAGE_BATCH_MAX and ops[-1][0] not in ('flush', 'close'):
+                try:
+                    ops.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            
+            searches, alerts, deleted_alerts, waiters = [], [], [], []
+            for kind, payload in ops:
+                if kind == 'search':
+                    searches.append(payload)
+                elif kind == 'alert':
+                    alerts.append(payload)
+                elif kind == 'alert_delete':
+                    deleted_alerts.append((payload,))
+                elif kind == 'flush':
+                    waiters.append(payload)
+                elif kind == 'close':
+                    running = False
+            
+            try:
+                self._commit_batch(conn, searches, alerts, deleted_alerts)
+            except Exception:
+                logger.exception("Dropping a batch of %d storage writes", len(ops) - len(waiters))
+            finally:
+                for done in waiters:
+                    done.set()
+        conn.close()
+    
+    def _commit_batch(self, conn: sqlite3.Connection, searches: List, alerts: List, deleted_alerts: List) -> None:
+        """Write one batch in a single transaction, retrying while the database is locked.
+
+        If the batch fails for any other reason, each write is retried in its
+        own transaction and only the ones that still fail are logged and skipped.
+        """
+        for attempt in range(STORAGE_WRITE_ATTEMPTS):
+            try:
+                self._apply(conn, searches, alerts, deleted_alerts)
+                return
+            except sqlite3.OperationalError:
+                if attempt == STORAGE_WRITE_ATTEMPTS - 1:
+                    raise
+                time.sleep(self.flush_seconds)
+            except sqlite3.Error:
+                break
+        writes = ([([search], [], []) for search in searches] + [([], [alert], []) for alert in alerts]
+                  + [([], [], [deleted]) for deleted in deleted_alerts])
+        for write in writes:
+            try:
+                self._apply(conn, *write)
+            except sqlite3.Error:
+                logger.exception("Dropping storage write %r", write)
+    
+    def _apply(self, conn: sqlite3.Connection, searches: List, alerts: List, deleted_alerts: List) -> None:
+        with conn:
+            conn.executemany("INSERT INTO search_history (session_id, route, date, timestamp) VALUES (?, ?, ?, ?)", searches)
+            conn.executemany("INSERT OR REPLACE INTO price_alerts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", alerts)
+            conn.executemany("DELETE FROM price_alerts WHERE alert_id = ?", deleted_alerts)
+    
+    # Reads: indexed lookups on the calling thread's connection
+    def find_lock(self, fare_key: str, now: float) -> Optional[PriceLock]:
+        row = self._connection().execute(
+            "SELECT * FROM price_locks WHERE fare_key = ? AND locked_until > ?", (fare_key, now)
+        ).fetchone()
+        return PriceLock(*row) if row else None
+    
+    def load_locks(self, now: float) -> List[PriceLock]:
+        rows = self._connection().execute("SELECT * FROM price_locks WHERE locked_until > ?", (now,)).fetchall()
+        return [PriceLock(*row) for row in rows]
+    
+    def load_search_history(self, session_id: str, limit: int = 20) -> List[Dict]:
+        rows = self._connection().execute(
+            "SELECT route, date, timestamp FROM search_history WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+            (session_id, limit)
+        ).fetchall()
+        return [{'route': route, 'date': date, 'timestamp': ts} for route, date, ts in reversed(rows)]
+    
+    def load_price_alerts(self) -> List[Dict]:
+        rows = self._connection().execute(f"SELECT {', '.join(self.ALERT_COLUMNS)} FROM price_alerts").fetchall()
+        return [dict(zip(self.ALERT_COLUMNS, row)) for row in rows]
+
+def create_storage_backend():
+    """SQLite backend when CHEEPNOW_DB_PATH is set, otherwise in-memory"""
+    path = os.environ.get(STORAGE_PATH_ENV)
+    return SQLiteBackend(path) if path else MemoryBackend()
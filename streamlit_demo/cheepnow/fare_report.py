@@ -0,0 +1,60 @@
+"""Fare report: summarize every popular route for the coming days.
+
+    python -m cheepnow.fare_report                            # POPULAR_ROUTES x 90 days from today
+    python -m cheepnow.fare_report --days 30 --workers 8 --output fares.jsonl
+
+Jobs are searched with `batch_search` across a process pool, and one JSON line
+per (route, date) is written with its cheapest fare, best value and average
+price. Fares are regenerated every seeding epoch, so the report shows what
+travelers see for the epoch it ran in (`--now`), and it does not warm the
+app's or the API's search cache.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from .core.bulk import FARE_REPORT_DAYS, batch_search, fare_report_jobs
+from .core.rng import SEED_EPOCH_SECONDS, epoch_bucket
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=FARE_REPORT_DAYS, help="days to report from --start")
+    parser.add_argument("--start", help="first date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, help="jobs per worker task (default: sized from the job count)")
+    parser.add_argument("--now", type=float, help="report fares for the epoch containing this Unix time (default: now)")
+    parser.add_argument("--output", help="write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    now = args.now if args.now is not None else time.time()
+    jobs = fare_report_jobs(args.days, args.start)
+    started = time.perf_counter()
+    workers = args.workers or os.cpu_count() or 1
+    if workers == 1:
+        summaries = batch_search(jobs, max_workers=1, chunk_size=args.chunk_size, now=now)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = batch_search(jobs, max_workers=workers, chunk_size=args.chunk_size, executor=pool, now=now)
+    elapsed = time.perf_counter() - started
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for summary in summaries:
+            out.write(json.dumps(asdict(summary), ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    valid_until = datetime.fromtimestamp((epoch_bucket(now) + 1) * SEED_EPOCH_SECONDS, timezone.utc)
+    print(f"Reported {len(jobs)} route-days ({sum(s.flights_found for s in summaries):,} flights) "
+          f"in {elapsed:.2f}s, {len(jobs) / elapsed:,.0f} jobs/s; fares valid until {valid_until.isoformat()}",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
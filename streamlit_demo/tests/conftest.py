@@ -0,0 +1,18 @@
+"""Shared fixtures: small seeded result sets from the real generator"""
+import numpy as np
+import pytest
+
+from cheepnow.core import FlightBatch, generate_flight_batch, rank_batch
+
+JOBS = [("MNL", "CEB", "2026-11-15"), ("MNL", "DVO", "2026-11-15"), ("CEB", "MNL", "2026-11-16")]
+
+def make_batch(jobs=JOBS, seed: int = 7) -> FlightBatch:
+    return rank_batch(generate_flight_batch(jobs, np.random.default_rng(seed)))
+
+@pytest.fixture
+def batch() -> FlightBatch:
+    return make_batch()
+
+@pytest.fixture
+def single_route() -> FlightBatch:
+    return make_batch(JOBS[:1])
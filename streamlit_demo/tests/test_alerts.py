@@ -0,0 +1,59 @@
+import numpy as np
+
+from cheepnow.core import MemoryBackend, PriceAlertEngine
+
+def test_route_alert_fires_once_below_its_threshold(single_route):
+    engine = PriceAlertEngine()
+    cheapest = float(single_route.total_price.min())
+    engine.add("ana", "MNL", "CEB", cheapest)  # not undercut: the fare equals the threshold
+    below = engine.add("ana", "MNL", "CEB", cheapest + 1)
+
+    matches = engine.evaluate(single_route)
+    assert [match.alert for match in matches] == [below]
+    assert matches[0].price == cheapest
+    assert matches[0].flight.total_price == cheapest
+    assert engine.evaluate(single_route) == []  # fired alerts are retired
+    assert len(engine) == 1
+
+def test_alerts_only_match_their_route_and_date(batch):
+    engine = PriceAlertEngine()
+    engine.add("ana", "MNL", "CEB", 1e9, departure_date="2026-11-16")
+    engine.add("ana", "DVO", "MNL", 1e9)
+    dated = engine.add("ana", "CEB", "MNL", 1e9, departure_date="2026-11-16")
+    assert [match.alert for match in engine.evaluate(batch)] == [dated]
+
+def test_flight_alert_watches_one_flight(single_route):
+    engine = PriceAlertEngine()
+    flight = single_route[len(single_route) - 1]
+    alert = engine.add("ana", "MNL", "CEB", flight.total_price + 1, flight_number=flight.flight_number)
+    missed = engine.add("ana", "MNL", "CEB", 1.0, flight_number=flight.flight_number)
+    matches = engine.evaluate(single_route)
+    assert [(match.alert, match.flight.flight_number) for match in matches] == [(alert, flight.flight_number)]
+    assert engine.alerts_for("ana") == [missed]
+
+def test_notifications_go_to_their_owner(single_route):
+    engine = PriceAlertEngine()
+    engine.add("ana", "MNL", "CEB", 1e9)
+    engine.add("ben", "MNL", "CEB", 1.0)
+    engine.evaluate(single_route)
+    assert [match.alert.owner for match in engine.take_notifications("ana")] == ["ana"]
+    assert engine.take_notifications("ana") == []
+    assert engine.take_notifications("ben") == []
+
+def test_alerts_survive_a_restart_until_cancelled_or_fired(single_route):
+    backend = MemoryBackend()
+    engine = PriceAlertEngine(backend)
+    kept = engine.add("ana", "MNL", "CEB", 1.0)
+    cancelled = engine.add("ana", "MNL", "CEB", 2.0)
+    engine.add("ana", "MNL", "CEB", 1e9)
+    engine.remove(cancelled.alert_id)
+    engine.evaluate(single_route)
+
+    restored = PriceAlertEngine(backend)
+    assert restored.alerts_for("ana") == [kept]
+    assert not restored.remove(cancelled.alert_id)
+
+def test_empty_batch_fires_nothing(single_route):
+    engine = PriceAlertEngine()
+    engine.add("ana", "MNL", "CEB", 1e9)
+    assert engine.evaluate(single_route.take(np.array([], dtype=np.int64))) == []
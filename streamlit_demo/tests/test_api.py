@@ -0,0 +1,109 @@
+"""Drives the ASGI app directly, so these tests need Starlette but no HTTP client"""
+import asyncio
+import gzip
+import json
+from typing import Dict, List, Tuple
+from urllib.parse import urlencode
+
+import pytest
+
+pytest.importorskip("starlette")
+
+from cheepnow.api import create_app, parse_search_query
+from cheepnow.core import PriceAlertEngine, SearchCache
+
+QUERY = {'origin': "MNL", 'destination': "CEB", 'date': "2026-11-15"}
+
+def call(app, path: str, params: Dict = None, method: str = "GET", body=None,
+         headers: List[Tuple[str, str]] = ()) -> Tuple[int, Dict[str, str], bytes]:
+    """One request through the ASGI interface; returns status, headers and the raw body"""
+    payload = json.dumps(body).encode() if body is not None else b""
+    messages = []
+    requests = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        while not any(message['type'] == 'http.response.body' and not message.get('more_body', False)
+                      for message in messages):  # the client disconnects once the response is complete
+            await asyncio.sleep(0)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': urlencode(params or {}).encode(),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'client': ('127.0.0.1', 1234), 'server': ('testserver', 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    response_headers = {name.decode(): value.decode() for name, value in start['headers']}
+    return start['status'], response_headers, b"".join(message.get('body', b"") for message in messages[1:])
+
+@pytest.fixture
+def app():
+    return create_app(cache=SearchCache())
+
+@pytest.mark.parametrize("params, message", [
+    (dict(QUERY, origin="XXX"), "origin must be one of"),
+    (dict(QUERY, destination="MNL"), "origin and destination must differ"),
+    (dict(QUERY, date="15/11/2026"), "date must be YYYY-MM-DD"),
+    (dict(QUERY, passengers="two"), "passengers must be an integer"),
+    (dict(QUERY, passengers="0"), "passengers must be between"),
+    (dict(QUERY, sort="cheapest"), "sort must be one of"),
+    (dict(QUERY, limit="0"), "limit must be at least 1"),
+])
+def test_invalid_queries_are_rejected_with_400(app, params, message):
+    status, _, body = call(app, "/api/flights/search", params)
+    assert status == 400
+    assert message in json.loads(body)['error']
+
+@pytest.mark.parametrize("passengers", [2.0, True, "1.5"])
+def test_json_counts_must_be_integers(app, passengers):
+    status, _, _ = call(app, "/api/flights/search", method="POST", body=dict(QUERY, passengers=passengers))
+    assert status == 400
+
+def test_web_app_search_criteria_are_accepted():
+    query = parse_search_query({'origin': "mnl", 'destination': "ceb", 'departureDate': "2026-11-15",
+                                'passengers': {'adults': 2, 'children': 1, 'infants': 0}})
+    assert (query.origin, query.destination, query.passengers) == ("MNL", "CEB", 3)
+
+def test_search_pages_a_sort_order(app):
+    status, headers, body = call(app, "/api/flights/search", dict(QUERY, sort="price", limit="3"))
+    assert status == 200 and headers['x-cache'] == "MISS"
+    result = json.loads(body)
+    prices = [flight['total_price'] for flight in result['flights']]
+    assert result['count'] == len(prices) == min(3, result['total'])
+    assert prices == sorted(prices)
+    assert call(app, "/api/flights/search", dict(QUERY, sort="price", limit="3"))[1]['x-cache'] == "HIT"
+
+def test_matching_etag_gets_304(app):
+    _, headers, _ = call(app, "/api/flights/search", QUERY)
+    etag = headers['etag']
+    status, headers, body = call(app, "/api/flights/search", QUERY, headers=[("If-None-Match", etag)])
+    assert status == 304 and body == b"" and headers['etag'] == etag
+    assert call(app, "/api/flights/search", QUERY, headers=[("If-None-Match", "W/" + etag)])[0] == 304
+    assert call(app, "/api/flights/search", QUERY, headers=[("If-None-Match", '"stale"')])[0] == 200
+
+def test_etag_changes_with_the_representation(app):
+    etags = {call(app, "/api/flights/search", params)[1]['etag']
+             for params in (QUERY, dict(QUERY, passengers="2"), dict(QUERY, sort="price"), dict(QUERY, limit="1"))}
+    etags.add(call(app, "/api/flights/search/stream", QUERY)[1]['etag'])
+    assert len(etags) == 5
+
+def test_stream_and_gzip(app):
+    _, _, body = call(app, "/api/flights/search/stream", QUERY)
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert lines[0]['total'] == len(lines) - 1
+    status, headers, compressed = call(app, "/api/flights/search", QUERY, headers=[("Accept-Encoding", "gzip")])
+    assert status == 200 and headers['content-encoding'] == "gzip"
+    assert json.loads(gzip.decompress(compressed))['total'] == lines[0]['total']
+
+def test_api_searches_fire_shared_alerts():
+    alerts = PriceAlertEngine()
+    alerts.add("ana", "MNL", "CEB", 1e9)
+    call(create_app(cache=SearchCache(), alerts=alerts), "/api/flights/search", QUERY)
+    assert [match.alert.owner for match in alerts.take_notifications("ana")] == ["ana"]
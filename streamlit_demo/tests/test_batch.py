@@ -0,0 +1,51 @@
+import numpy as np
+
+from cheepnow.core import (
+    FlightBatch, batch_fingerprint, calculate_value_score, generate_flight_batch, score_flight_batch,
+)
+
+from conftest import JOBS, make_batch
+
+def test_columns_are_typed_and_aligned(batch):
+    assert len(batch) > 0
+    for name, dtype in FlightBatch.COLUMN_DTYPES.items():
+        column = getattr(batch, name)
+        assert column.dtype == dtype
+        assert len(column) == len(batch)
+
+def test_rows_view_their_job(batch):
+    for flight in batch:
+        origin, destination, departure_date = batch.jobs[batch.job[flight.row]]
+        assert (flight.departure_airport.code, flight.arrival_airport.code) == (origin, destination)
+        assert flight.departure_date == departure_date
+        assert np.isclose(flight.total_price, flight.base_price + flight.taxes, atol=0.01)
+
+def test_take_and_split_keep_rows(batch):
+    rows = np.array([2, 0, 1])
+    taken = batch.take(rows)
+    assert [flight.flight_number for flight in taken] == [batch[int(row)].flight_number for row in rows]
+    parts = batch.split()
+    assert len(parts) == len(JOBS)
+    assert sum(len(part) for part in parts) == len(batch)
+    assert all(set(part.job.tolist()) <= {job} for job, part in enumerate(parts))
+
+def test_generation_is_reproducible_from_its_seed():
+    first = generate_flight_batch(JOBS, np.random.default_rng(3))
+    second = generate_flight_batch(JOBS, np.random.default_rng(3))
+    assert batch_fingerprint(first) == batch_fingerprint(second)
+    assert batch_fingerprint(first) != batch_fingerprint(generate_flight_batch(JOBS, np.random.default_rng(4)))
+
+def test_scores_match_the_per_flight_formula(single_route):
+    flights = single_route.to_flights()
+    expected = [calculate_value_score(flight, flights) for flight in flights]
+    assert np.allclose(score_flight_batch(single_route), expected, atol=1e-3)
+
+def test_scores_do_not_depend_on_row_order(batch):
+    scores = score_flight_batch(batch)
+    shuffled = np.random.default_rng(0).permutation(len(batch))
+    assert np.allclose(score_flight_batch(batch.take(shuffled)), scores[shuffled])
+
+def test_ranked_batch_is_best_value_first():
+    batch = make_batch()
+    assert np.all(np.diff(batch.value_score) <= 0)
+    assert np.all((batch.value_score >= 0) & (batch.value_score <= 100))
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from cheepnow.core import PRICE_HISTORY_DAYS, PRICE_TRENDS, PriceHistoryStore
+
+KEY = ("PR 150", "MNL", "CEB", "2026-11-15")
+TODAY = date(2026, 11, 1)
+
+def test_first_observation_is_stable_then_trends_follow_the_average():
+    store = PriceHistoryStore()
+    assert store.record(KEY, 4000.0, TODAY) == "stable"
+    assert store.record(KEY, 4500.0, TODAY + timedelta(days=1)) == "rising"
+    assert store.record(KEY, 3500.0, TODAY + timedelta(days=2)) == "falling"
+    assert store.record(KEY, 4010.0, TODAY + timedelta(days=3)) == "stable"
+
+def test_window_is_oldest_first_with_gaps_missing():
+    store = PriceHistoryStore(capacity_days=7)
+    store.record(KEY, 100.0, TODAY)
+    store.record(KEY, 130.0, TODAY + timedelta(days=2))
+    window = store.window(KEY, 3, TODAY + timedelta(days=2))
+    assert window[0] == 100.0 and np.isnan(window[1]) and window[2] == 130.0
+    assert store.stats(KEY, 3, TODAY + timedelta(days=2)) == (100.0, 115.0, 130.0)
+    assert store.stats(("XX 1", "MNL", "CEB", "2026-11-15"), 3, TODAY) is None
+
+def test_ring_buffer_forgets_days_older_than_its_capacity():
+    store = PriceHistoryStore(capacity_days=5)
+    for offset in range(12):
+        store.record(KEY, 100.0 + offset, TODAY + timedelta(days=offset))
+    window = store.window(KEY, 5, TODAY + timedelta(days=11))
+    assert window.tolist() == [107.0, 108.0, 109.0, 110.0, 111.0]
+
+def test_observe_batch_fills_trends_and_history(single_route):
+    store = PriceHistoryStore()
+    store.observe_batch(single_route, TODAY)
+    assert len(store) == len(single_route)
+    assert set(single_route.price_trend.tolist()) == {PRICE_TRENDS.index("stable")}
+    assert single_route.history_dates[0] == TODAY.isoformat()
+    assert single_route.history_price.shape == (len(single_route), PRICE_HISTORY_DAYS)
+    assert np.array_equal(single_route.history_price[:, 0], single_route.total_price)
+
+    cheaper = single_route.take(np.arange(len(single_route)))
+    cheaper.total_price = cheaper.total_price * 0.8
+    store.observe_batch(cheaper, TODAY + timedelta(days=1))
+    assert set(cheaper.price_trend.tolist()) == {PRICE_TRENDS.index("falling")}
+    assert np.array_equal(cheaper.history_price[:, 1], single_route.total_price)
+
+def test_purge_drops_departed_flights():
+    store = PriceHistoryStore()
+    store.record(KEY, 100.0, TODAY)
+    later = ("PR 151", "MNL", "CEB", "2026-12-01")
+    store.record(later, 200.0, TODAY)
+    assert store.purge(date(2026, 11, 16)) == 1
+    assert len(store) == 1
+    assert store.window(later, 1, TODAY).tolist() == [200.0]
@@ -0,0 +1,53 @@
+import pytest
+
+from cheepnow.core import PRICE_LOCK_MINUTES, PriceLockStore, SQLiteBackend, fare_key, get_lock_time_remaining
+
+NOW = 1_000_000.0
+LOCK_SECONDS = PRICE_LOCK_MINUTES * 60
+
+@pytest.fixture
+def flights(single_route):
+    return single_route[0], single_route[1]
+
+def test_fare_can_only_be_locked_by_one_traveler(flights):
+    store = PriceLockStore()
+    flight = flights[0]
+    lock = store.acquire(fare_key(flight), "ana", flight, NOW)
+    assert lock.owner == "ana" and lock.original_price == flight.total_price
+    assert store.acquire(fare_key(flight), "ben", flight, NOW + 1) is None
+    renewed = store.acquire(fare_key(flight), "ana", flight, NOW + 60)
+    assert renewed.locked_until == NOW + 60 + LOCK_SECONDS
+    assert store.count("ana") == 1
+
+def test_expired_lock_frees_the_fare(flights):
+    store = PriceLockStore()
+    flight = flights[0]
+    store.acquire(fare_key(flight), "ana", flight, NOW)
+    assert get_lock_time_remaining(store.get(fare_key(flight), NOW), NOW + 60) == LOCK_SECONDS - 60
+    assert store.get(fare_key(flight), NOW + LOCK_SECONDS) is None
+    lock = store.acquire(fare_key(flight), "ben", flight, NOW + LOCK_SECONDS)
+    assert lock.owner == "ben"
+    assert store.count("ana") == 0 and store.count("ben") == 1
+
+def test_owner_index_follows_purges(flights):
+    store = PriceLockStore()
+    first, second = flights
+    store.acquire(fare_key(first), "ana", first, NOW)
+    store.acquire(fare_key(second), "ana", second, NOW + 30)
+    assert [lock.fare_key for lock in store.owned_by("ana")] == [fare_key(first), fare_key(second)]
+    assert store.purge(NOW + LOCK_SECONDS) == 1
+    assert [lock.fare_key for lock in store.owned_by("ana")] == [fare_key(second)]
+    assert store.count() == 1
+
+def test_stores_sharing_a_database_contend_for_fares(tmp_path, flights):
+    backends = [SQLiteBackend(str(tmp_path / "locks.db")) for _ in range(3)]
+    try:
+        ours, theirs = PriceLockStore(backends[0], now=NOW), PriceLockStore(backends[1], now=NOW)
+        flight = flights[0]
+        assert ours.acquire(fare_key(flight), "ana", flight, NOW) is not None
+        assert theirs.acquire(fare_key(flight), "ben", flight, NOW + 1) is None
+        assert theirs.get(fare_key(flight), NOW + 1).owner == "ana"  # the winner's lock is kept locally
+        assert PriceLockStore(backends[2], now=NOW).count("ana") == 1
+    finally:
+        for backend in backends:
+            backend.close()
@@ -0,0 +1,80 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from cheepnow.core import (
+    SORT_ORDER_KEYS, SearchCache, batch_search, build_sort_orders, rank_round_trips, search_flights,
+    sort_flight_indices, summarize_results, top_k_pair_sums, top_k_rows,
+)
+
+NOW = 1_790_000_000.0
+
+@pytest.fixture(scope="module")
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+@pytest.mark.parametrize("seed", range(20))
+def test_top_k_pair_sums_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    first = sorted(rng.integers(0, 50, rng.integers(1, 12)).tolist())
+    second = sorted(rng.integers(0, 50, rng.integers(1, 12)).tolist())
+    k = int(rng.integers(1, 20))
+    pairs = top_k_pair_sums(first, second, k)
+    every_sum = sorted(a + b for a, b in itertools.product(first, second))
+    assert len(pairs) == min(k, len(every_sum))
+    assert len(set(pairs)) == len(pairs)
+    assert [first[i] + second[j] for i, j in pairs] == every_sum[:len(pairs)]
+
+def test_top_k_pair_sums_empty_inputs():
+    assert top_k_pair_sums([], [1.0], 3) == []
+    assert top_k_pair_sums([1.0], [2.0], 0) == []
+
+@pytest.mark.parametrize("k", [0, 1, 3, 7, 100])
+def test_top_k_rows_matches_a_stable_sort(k):
+    key = np.random.default_rng(k).integers(0, 10, 40).astype(np.float32)  # plenty of ties
+    assert top_k_rows(key, k).tolist() == np.argsort(key, kind="stable")[:k].tolist()
+
+def test_summary_leaders(batch):
+    summary = summarize_results(batch, k=3)
+    assert summary.count == len(batch)
+    assert batch.total_price[summary.cheapest] == batch.total_price.min()
+    assert batch.value_score[summary.best_value] == batch.value_score.max()
+    assert batch.carbon_emissions[summary.eco] == batch.carbon_emissions.min()
+    assert summarize_results(batch.take(np.array([], dtype=np.int64))) is None
+
+def test_sort_orders_are_built_on_demand(batch):
+    orders = build_sort_orders(batch, ranked=True)
+    assert orders['value'].tolist() == list(range(len(batch)))
+    assert orders._orders.keys() == {'value'}
+    for sort_by in SORT_ORDER_KEYS:
+        assert orders[sort_by].tolist() == sort_flight_indices(batch, sort_by).tolist()
+    assert orders.departure_index.count_between(0, 24 * 60) == len(batch)
+    with pytest.raises(KeyError):
+        orders['nonsense']
+
+def test_search_is_cached_per_route_date_and_epoch(executor):
+    cache = SearchCache()
+    first, cached = search_flights("MNL", "CEB", "2026-11-15", executor, cache, now=NOW)
+    assert not cached
+    again, cached = search_flights("MNL", "CEB", "2026-11-15", executor, cache, now=NOW + 1)
+    assert cached and again is first
+    fresh, cached = search_flights("MNL", "CEB", "2026-11-15", executor, SearchCache(), now=NOW)
+    assert not cached and fresh.fingerprint == first.fingerprint
+
+def test_batch_search_matches_search_flights(executor):
+    jobs = [("MNL", "CEB", "2026-11-15"), ("CEB", "MNL", "2026-11-16")]
+    expected = [search_flights(*job, executor, SearchCache(), now=NOW)[0].flights for job in jobs]
+    for chunk_size in (1, 2):
+        batches = batch_search(jobs, summarize=False, max_workers=1, chunk_size=chunk_size, now=NOW)
+        for batch, reference in zip(batches, expected):
+            assert np.array_equal(batch.total_price, reference.total_price)
+            assert np.array_equal(batch.value_score, reference.value_score)
+
+def test_round_trips_are_cheapest_combinations(batch):
+    outbound, inbound = batch.split()[:2]
+    options = rank_round_trips(outbound, inbound, k=4)
+    totals = sorted(float(a) + float(b) for a, b in itertools.product(outbound.total_price, inbound.total_price))
+    assert [option.total_price for option in options] == pytest.approx(totals[:4])
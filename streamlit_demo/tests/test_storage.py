@@ -0,0 +1,65 @@
+import pytest
+
+from cheepnow.core import MemoryBackend, PriceLock, SQLiteBackend
+
+def make_lock(owner: str, locked_until: float, fare_key: str = "PR 150|MNL-CEB|2026-11-15") -> PriceLock:
+    return PriceLock(fare_key, owner, "PR1501", "PR 150", "MNL", "CEB", "2026-11-15", 4200.0, locked_until)
+
+ALERT = {'alert_id': "a1", 'owner': "ana", 'origin': "MNL", 'destination': "CEB", 'threshold': 3000.0,
+         'departure_date': None, 'flight_number': "PR 150", 'created_at': 1.0}
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    backend = MemoryBackend() if request.param == "memory" else SQLiteBackend(str(tmp_path / "state.db"))
+    yield backend
+    backend.close()
+
+def test_claim_lock_refuses_a_fare_held_by_someone_else(backend):
+    assert backend.claim_lock(make_lock("ana", 200.0), now=100.0)
+    assert not backend.claim_lock(make_lock("ben", 300.0), now=150.0)
+    assert backend.claim_lock(make_lock("ana", 400.0), now=150.0)  # the holder may extend
+    assert backend.find_lock(make_lock("ana", 0).fare_key, 150.0).locked_until == 400.0
+    assert backend.claim_lock(make_lock("ben", 500.0), now=400.0)  # expired: anyone may take it
+    assert [lock.owner for lock in backend.load_locks(400.0)] == ["ben"]
+
+def test_expired_locks_are_deleted(backend):
+    backend.claim_lock(make_lock("ana", 200.0, "one"), now=100.0)
+    backend.claim_lock(make_lock("ana", 900.0, "two"), now=100.0)
+    assert [lock.fare_key for lock in backend.load_locks(300.0)] == ["two"]
+    backend.claim_lock(make_lock("ben", 900.0, "three"), now=300.0)
+    assert backend.find_lock("one", 0.0) is None
+
+def test_search_history_and_alerts_round_trip(backend):
+    for day in ("2026-11-15", "2026-11-16", "2026-11-17"):
+        backend.append_search("ana", {'route': "MNL → CEB", 'date': day, 'timestamp': "10:00"})
+    backend.save_price_alert(ALERT)
+    backend.save_price_alert(dict(ALERT, alert_id="a2"))
+    backend.delete_price_alerts(["a2"])
+    backend.flush()
+    assert [record['date'] for record in backend.load_search_history("ana", limit=2)] == ["2026-11-16", "2026-11-17"]
+    assert backend.load_search_history("ben") == []
+    assert backend.load_price_alerts() == [ALERT]
+
+def test_sqlite_state_survives_reopening(tmp_path):
+    path = str(tmp_path / "state.db")
+    backend = SQLiteBackend(path)
+    backend.claim_lock(make_lock("ana", 200.0), now=100.0)
+    backend.save_price_alert(ALERT)
+    backend.close()  # flushes queued writes
+
+    reopened = SQLiteBackend(path)
+    try:
+        assert [lock.owner for lock in reopened.load_locks(150.0)] == ["ana"]
+        assert reopened.load_price_alerts() == [ALERT]
+    finally:
+        reopened.close()
+
+def test_sqlite_writer_survives_a_failed_write(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "state.db"), flush_seconds=0.01)
+    try:
+        backend.save_price_alert(dict(ALERT, threshold=None))  # violates NOT NULL
+        backend.save_price_alert(ALERT)
+        backend.flush()
+        assert backend.load_price_alerts() == [ALERT]
+    finally:
+        backend.close()